@@ -1,44 +1,960 @@
 from fastmcp import FastMCP
-from typing import Dict, List, Optional, Union, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union, Any
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import base64
+import bz2
+import csv
+import gzip
 import sqlite3
 import os
+import sys
 import json
+import threading
+import time
+import urllib.parse
+import logging
+import lzma
 
 # Create the FastMCP server instance for Database MCP
 mcp = FastMCP(name="E-commerce Database Connector")
 
+logger = logging.getLogger(__name__)
+
+# Rows fetched from SQLite per batch when streaming query results
+STREAM_CHUNK_SIZE = 1000
+
+# Page size bounds for the keyset-paginated resources and tools
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# IDs bound per IN (...) query; SQLite's default limit on host parameters is 999
+MAX_QUERY_VARIABLES = 999
+
+# Export file formats and compression
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+# Stream compressors for the text formats, with their file suffix; Parquet compresses its columns itself
+EXPORT_COMPRESSION = {
+    "gzip": (gzip.open, ".gz"),
+    "bz2": (bz2.open, ".bz2"),
+    "xz": (lzma.open, ".xz")
+}
+PARQUET_COMPRESSION = ("snappy", "gzip", "zstd", "brotli", "lz4", "none")
+# Rows buffered per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Default path relative to the ecommerce site
+DEFAULT_DB_PATH = os.environ.get(
+    "ECOMMERCE_DB_PATH",
+    "/Users/rishabhsharma/PycharmProjects/ecommerce-site/scripts/db/ecommerce.db"
+)
+
+
+class ConnectionProfile:
+    """Connection settings and pragmas applied to every connection the connector opens."""
+
+    def __init__(self, journal_mode: Optional[str] = "wal", read_only: bool = True,
+                 mmap_size: int = 256 * 1024 * 1024, cache_size: int = -64 * 1024,
+                 busy_timeout: int = 5000):
+        """
+        Initialize the profile.
+
+        Args:
+            journal_mode: Journal mode set on the database when the pool starts; None leaves it unchanged.
+                          WAL lets readers run while the site writes.
+            read_only: Open reader connections with a `mode=ro` URI and `query_only` set
+            mmap_size: Bytes of the database file readers map into memory (0 disables)
+            cache_size: SQLite page cache per connection; negative values are KiB, positive values pages
+            busy_timeout: Milliseconds to wait on a lock before failing with "database is locked"
+        """
+        self.journal_mode = journal_mode
+        self.read_only = read_only
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+
+    @classmethod
+    def from_env(cls) -> "ConnectionProfile":
+        """Build a profile from the ECOMMERCE_DB_* environment variables."""
+        return cls(
+            journal_mode=os.environ.get("ECOMMERCE_DB_JOURNAL_MODE", "wal") or None,
+            read_only=_env_flag("ECOMMERCE_DB_READ_ONLY", True),
+            mmap_size=int(os.environ.get("ECOMMERCE_DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+            cache_size=int(os.environ.get("ECOMMERCE_DB_CACHE_SIZE", str(-64 * 1024))),
+            busy_timeout=int(os.environ.get("ECOMMERCE_DB_BUSY_TIMEOUT", "5000"))
+        )
+
+    def connect(self, db_path: str, read_only: bool = True, check_same_thread: bool = True) -> sqlite3.Connection:
+        """
+        Open a connection to the database with this profile's settings.
+
+        Args:
+            db_path: Path to the SQLite database
+            read_only: Whether the connection only reads; ignored if the profile is not read-only
+            check_same_thread: Passed through to sqlite3.connect
+
+        Returns:
+            A configured connection returning rows as sqlite3.Row
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Database file not found at: {db_path}")
+
+        read_only = read_only and self.read_only
+        if read_only:
+            uri = "file:%s?mode=ro" % urllib.parse.quote(os.path.abspath(db_path))
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread,
+                                         timeout=self.busy_timeout / 1000)
+        else:
+            connection = sqlite3.connect(db_path, check_same_thread=check_same_thread,
+                                         timeout=self.busy_timeout / 1000)
+        # Configure SQLite connection to return rows as dictionaries
+        connection.row_factory = sqlite3.Row
+
+        connection.execute("PRAGMA busy_timeout = %d" % self.busy_timeout)
+        connection.execute("PRAGMA cache_size = %d" % self.cache_size)
+        connection.execute("PRAGMA mmap_size = %d" % self.mmap_size)
+        if read_only:
+            connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    def prepare_database(self, db_path: str) -> None:
+        """
+        Switch the database to the profile's journal mode.
+
+        The journal mode is stored in the database file, so this needs a writable
+        connection once rather than a pragma on every connection.
+        """
+        if not self.journal_mode:
+            return
+        connection = self.connect(db_path, read_only=False)
+        try:
+            mode = connection.execute("PRAGMA journal_mode = %s" % self.journal_mode).fetchone()[0]
+            if mode.lower() != self.journal_mode.lower():
+                logger.warning("Could not set journal mode %s on %s; it is %s", self.journal_mode, db_path, mode)
+        finally:
+            connection.close()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the profile's settings."""
+        return {
+            "journal_mode": self.journal_mode,
+            "read_only": self.read_only,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "busy_timeout": self.busy_timeout
+        }
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections owned by the server process."""
+
+    def __init__(self, db_path: str, size: int = 4, health_check_interval: float = 30.0,
+                 profile: Optional[ConnectionProfile] = None):
+        """
+        Initialize the pool. Connections are opened lazily.
+
+        Args:
+            db_path: Path to the SQLite database
+            size: Maximum number of reader connections checked out at once
+            health_check_interval: Seconds a connection may sit idle before it is
+                                   checked with a trivial query on checkout
+            profile: Settings for every connection; defaults to ConnectionProfile()
+        """
+        self.db_path = db_path
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.profile = profile or ConnectionProfile()
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        # Idle reader connections with the time they were returned; reused LIFO so warm ones go first
+        self._idle: List[tuple] = []
+        # Checked-out reader connections by borrowing thread, so a stuck query can be interrupted
+        self._borrowed: Dict[int, List[sqlite3.Connection]] = {}
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        # Dedicated, never-writing connection so PRAGMA data_version sees every commit
+        self._version_connection: Optional[sqlite3.Connection] = None
+        self._version_lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "waits": 0,
+            "health_check_failures": 0,
+            "interrupts": 0
+        }
+
+    def _open(self, read_only: bool = True) -> sqlite3.Connection:
+        """Open a new connection with the pool's profile."""
+        # Pooled connections move between threads, but only one thread holds a connection at a time
+        connection = self.profile.connect(self.db_path, read_only=read_only, check_same_thread=False)
+        with self._lock:
+            self._stats["opened"] += 1
+        return connection
+
+    def _is_healthy(self, connection: sqlite3.Connection) -> bool:
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            with self._lock:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """
+        Check out a reader connection, waiting for a free slot if the pool is exhausted.
+
+        Args:
+            timeout: Seconds to wait for a free slot; None waits indefinitely
+
+        Returns:
+            A connection that must be handed back with `release`
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=timeout):
+                raise TimeoutError(f"No database connection available within {timeout} seconds")
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned_at = self._idle.pop()
+
+                fresh = time.monotonic() - returned_at < self.health_check_interval
+                if self._is_current(connection) and (fresh or self._is_healthy(connection)):
+                    with self._lock:
+                        self._stats["reused"] += 1
+                    return self._lend(connection)
+                connection.close()
+
+            return self._lend(self._open())
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _is_current(self, connection: sqlite3.Connection) -> bool:
+        """Whether an idle connection may still be handed out; subclasses retire outdated ones."""
+        return True
+
+    def _lend(self, connection: sqlite3.Connection) -> sqlite3.Connection:
+        """Record the calling thread as the borrower of a connection."""
+        with self._lock:
+            self._borrowed.setdefault(threading.get_ident(), []).append(connection)
+        return connection
+
+    def interrupt(self, thread_id: int) -> int:
+        """
+        Abort the statements running on the reader connections a thread has checked out.
+
+        The interrupted query raises sqlite3.OperationalError in the borrowing thread.
+
+        Args:
+            thread_id: Identifier of the borrowing thread, as returned by threading.get_ident()
+
+        Returns:
+            int: Number of connections interrupted
+        """
+        with self._lock:
+            connections = self._borrowed.get(thread_id, [])
+            # Held under the lock so a connection cannot be released and lent to another query meanwhile
+            for connection in connections:
+                connection.interrupt()
+            self._stats["interrupts"] += len(connections)
+            return len(connections)
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        """Return a connection obtained from `acquire`."""
+        with self._lock:
+            for thread_id, connections in list(self._borrowed.items()):
+                if connection in connections:
+                    connections.remove(connection)
+                    if not connections:
+                        del self._borrowed[thread_id]
+                    break
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            with self._lock:
+                if self._closed or not self._is_current(connection):
+                    connection.close()
+                else:
+                    self._idle.append((connection, time.monotonic()))
+        except sqlite3.Error:
+            connection.close()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Context manager checking out a reader connection."""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Context manager holding the pool's single writer connection.
+
+        The block runs in a transaction that is committed on success and rolled back on error.
+        """
+        with self._writer_lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._writer is None or not self._is_healthy(self._writer):
+                if self._writer is not None:
+                    self._writer.close()
+                self._writer = self._open(read_only=False)
+            with self._writer:
+                yield self._writer
+
+    def data_version(self) -> int:
+        """
+        Return SQLite's data version for the database.
+
+        The value changes whenever any connection (including this pool's writer or
+        another process) commits a change, so it can be used to invalidate caches.
+        """
+        with self._version_lock:
+            if self._version_connection is None:
+                self._version_connection = self._open()
+            return self._version_connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool size, idle connections and checkout counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "size": self.size,
+                "idle": len(self._idle),
+                "writer_open": self._writer is not None,
+                "profile": self.profile.as_dict()
+            }
+
+    def close(self) -> None:
+        """Close every idle connection and the writer; checked-out connections close on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._version_lock:
+            if self._version_connection is not None:
+                self._version_connection.close()
+                self._version_connection = None
+
+
+class _SnapshotConnection(sqlite3.Connection):
+    """Connection to an in-memory snapshot, tagged with the snapshot generation it reads."""
+
+    generation = 0
+
+
+class SnapshotPool(ConnectionPool):
+    """
+    Connection pool serving reads from an in-memory copy of the database.
+
+    The copy is taken with SQLite's backup API into a shared-cache in-memory database.
+    A background thread polls the file's PRAGMA data_version and, when it changes, takes
+    a new copy and swaps it in; queries already running finish on the copy they started on.
+    Writes still go to the file through the writer connection and are picked up by a
+    refresh right after they commit.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, health_check_interval: float = 30.0,
+                 profile: Optional[ConnectionProfile] = None, poll_interval: float = 1.0):
+        """
+        Initialize the pool and take the first snapshot.
+
+        Args:
+            db_path: Path to the SQLite database
+            size: Maximum number of reader connections checked out at once
+            health_check_interval: Seconds a connection may sit idle before it is
+                                   checked with a trivial query on checkout
+            profile: Settings for the connections to the database file
+            poll_interval: Seconds between checks of the file for changes
+        """
+        super().__init__(db_path, size=size, health_check_interval=health_check_interval, profile=profile)
+        self.poll_interval = poll_interval
+
+        # Serializes refreshes; held while copying, so readers never wait on it
+        self._refresh_lock = threading.Lock()
+        # Held while swapping snapshots and while opening a reader, so a reader never
+        # opens a snapshot whose last connection was just closed
+        self._swap_lock = threading.Lock()
+        self._source: Optional[sqlite3.Connection] = None
+        self._source_version: Optional[int] = None
+        # Connection keeping the current in-memory database alive
+        self._anchor: Optional[sqlite3.Connection] = None
+        self._uri: Optional[str] = None
+        self._generation = 0
+        self._snapshot_stats = {
+            "snapshots": 0,
+            "last_snapshot_seconds": None,
+            "last_snapshot_at": None
+        }
+
+        self.refresh()
+        self._stop = threading.Event()
+        self._poller = threading.Thread(target=self._poll, name="ecommerce-db-snapshot", daemon=True)
+        self._poller.start()
+
+    def refresh(self) -> bool:
+        """
+        Take a new snapshot if the database file changed since the last one.
+
+        Returns:
+            bool: True if a new snapshot was swapped in
+        """
+        with self._refresh_lock:
+            if self._source is None:
+                self._source = self.profile.connect(self.db_path, check_same_thread=False)
+            version = self._source.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._source_version:
+                return False
+
+            started = time.monotonic()
+            generation = self._generation + 1
+            uri = "file:ecommerce_snapshot_%d_%d?mode=memory&cache=shared" % (id(self), generation)
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            try:
+                self._source.backup(anchor)
+            except BaseException:
+                anchor.close()
+                raise
+
+            with self._swap_lock:
+                previous, self._anchor = self._anchor, anchor
+                self._uri = uri
+                self._generation = generation
+                self._source_version = version
+            with self._lock:
+                outdated = [connection for connection, _ in self._idle if not self._is_current(connection)]
+                self._idle = [entry for entry in self._idle if self._is_current(entry[0])]
+                self._snapshot_stats["snapshots"] += 1
+                self._snapshot_stats["last_snapshot_seconds"] = round(time.monotonic() - started, 3)
+                self._snapshot_stats["last_snapshot_at"] = time.time()
+            # Checked-out connections keep the previous snapshot alive until they are released
+            for connection in outdated:
+                connection.close()
+            if previous is not None:
+                previous.close()
+            return True
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Could not refresh the snapshot of %s: %s", self.db_path, e)
+
+    def _open(self, read_only: bool = True) -> sqlite3.Connection:
+        """Open a connection to the current snapshot, or to the file for the writer."""
+        if not read_only:
+            return super()._open(read_only=False)
+
+        with self._swap_lock:
+            connection = sqlite3.connect(self._uri, uri=True, check_same_thread=False,
+                                         factory=_SnapshotConnection)
+            connection.generation = self._generation
+        # Configure SQLite connection to return rows as dictionaries
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only = ON")
+        with self._lock:
+            self._stats["opened"] += 1
+        return connection
+
+    def _is_current(self, connection: sqlite3.Connection) -> bool:
+        return connection.generation == self._generation
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Context manager holding the writer connection; the snapshot is refreshed after it commits."""
+        with super().writer() as connection:
+            yield connection
+        self.refresh()
+
+    def data_version(self) -> int:
+        """Return the snapshot generation, which changes whenever a new snapshot is swapped in."""
+        return self._generation
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the pool statistics plus the current snapshot's generation and timings."""
+        stats = super().stats()
+        with self._lock:
+            stats["snapshot"] = {
+                **self._snapshot_stats,
+                "generation": self._generation,
+                "poll_interval": self.poll_interval
+            }
+        return stats
+
+    def close(self) -> None:
+        """Stop polling and close every connection, including the snapshot's."""
+        self._stop.set()
+        super().close()
+        with self._refresh_lock:
+            if self._source is not None:
+                self._source.close()
+                self._source = None
+            with self._swap_lock:
+                if self._anchor is not None:
+                    self._anchor.close()
+                    self._anchor = None
+
+
+class DatabaseStatistics:
+    """Aggregate statistics about the database, computed in SQL and cached until the data changes."""
+
+    def __init__(self, pool: ConnectionPool):
+        """
+        Initialize the statistics cache.
+
+        Args:
+            pool: Connection pool used for the aggregate queries and data version checks
+        """
+        self.pool = pool
+
+        self._lock = threading.Lock()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_version: Optional[int] = None
+        self._hits = 0
+        self._refreshes = 0
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Return the current statistics, recomputing them only if the database changed.
+
+        Returns:
+            Dict[str, Any]: Row counts, per-category product figures, inventory totals
+                            and the distribution of cards per user
+        """
+        with self._lock:
+            # Read the version first: a commit during the recompute then triggers another one next time
+            version = self.pool.data_version()
+            if self._cached is None or self._cached_version != version:
+                with self.pool.reader() as connection:
+                    self._cached = self._compute(connection)
+                self._cached_version = version
+                self._refreshes += 1
+            else:
+                self._hits += 1
+            return self._cached
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Return how often the statistics were served from cache versus recomputed."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "refreshes": self._refreshes,
+                "data_version": self._cached_version
+            }
+
+    @staticmethod
+    def _compute(connection: sqlite3.Connection) -> Dict[str, Any]:
+        counts = connection.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM users) AS users,
+                   (SELECT COUNT(*) FROM products) AS products,
+                   (SELECT COUNT(*) FROM cards) AS cards
+            """
+        ).fetchone()
+
+        categories = connection.execute(
+            """
+            SELECT category, COUNT(*) AS products, SUM(inventory) AS inventory
+            FROM products
+            GROUP BY category
+            ORDER BY category
+            """
+        ).fetchall()
+
+        inventory = connection.execute(
+            """
+            SELECT COALESCE(SUM(inventory), 0) AS units,
+                   COALESCE(SUM(price * inventory), 0) AS value,
+                   COALESCE(SUM(CASE WHEN inventory <= 0 THEN 1 ELSE 0 END), 0) AS out_of_stock
+            FROM products
+            """
+        ).fetchone()
+
+        cards_per_user = connection.execute(
+            """
+            SELECT card_count, COUNT(*) AS users
+            FROM (SELECT COUNT(*) AS card_count FROM cards GROUP BY user_id)
+            GROUP BY card_count
+            ORDER BY card_count
+            """
+        ).fetchall()
+        users_with_cards = sum(row["users"] for row in cards_per_user)
+
+        distribution = {str(row["card_count"]): row["users"] for row in cards_per_user}
+        if counts["users"] > users_with_cards:
+            distribution = {"0": counts["users"] - users_with_cards, **distribution}
+
+        return {
+            "counts": dict(counts),
+            "products_by_category": {
+                row["category"]: {"products": row["products"], "inventory": row["inventory"]}
+                for row in categories
+            },
+            "inventory": {
+                "units": inventory["units"],
+                "value": round(inventory["value"], 2),
+                "out_of_stock_products": inventory["out_of_stock"]
+            },
+            "cards_per_user": distribution
+        }
+
+
+class ResultCache:
+    """LRU cache of query results with a memory budget, cleared whenever the database's data version changes."""
+
+    def __init__(self, pool: ConnectionPool, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Initialize the result cache.
+
+        Args:
+            pool: Connection pool whose data version the cached results belong to
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum total size of the cached results, as serialized JSON
+        """
+        self.pool = pool
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> serialized result; ordered from least to most recently used
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[int] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+
+    def sync(self) -> int:
+        """
+        Drop every entry if the data version changed since they were stored.
+
+        Returns:
+            int: The current data version, to be passed to `set` for a result read afterwards
+        """
+        version = self.pool.data_version()
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+        return version
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """
+        Return a copy of the cached result for `key`, or None on a miss.
+
+        Call `sync` first so a result from an older data version is never returned.
+        """
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+
+        # Stored as JSON so callers can never mutate the cached copy
+        return json.loads(serialized)
+
+    def set(self, key: Tuple, value: Any, version: int) -> None:
+        """
+        Cache `value` under `key`, evicting least recently used entries to stay within budget.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable result
+            version: Data version returned by `sync` before the result was read; the result
+                     is dropped if the data changed since
+        """
+        # Serialize piece by piece so a result over budget is given up on without ever
+        # building a second full copy of it
+        parts = []
+        size = 0
+        for part in json.JSONEncoder().iterencode(value):
+            size += len(part)
+            if size > self.max_bytes:
+                return
+            parts.append(part)
+        serialized = "".join(parts)
+
+        with self._lock:
+            if version != self._version:
+                return
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = serialized
+            self._bytes += len(serialized)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current memory use."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "data_version": self._version
+            }
+
+
+# Every static SQL statement the connector runs, keyed by name. The query-plan
+# auditor explains each of these, so new connector queries should be added here.
+# `{ids}` is replaced with one placeholder per ID by DatabaseConnector._execute_for_ids.
+QUERIES: Dict[str, str] = {
+    "all_users": """
+        SELECT id, username, email, first_name, last_name,
+               address, city, state, zip_code, country, phone,
+               created_at, last_login
+        FROM users
+        ORDER BY id
+    """,
+    "all_products": """
+        SELECT id, name, description, price, image,
+               category, inventory, created_at, updated_at
+        FROM products
+        ORDER BY id
+    """,
+    "all_cards": """
+        SELECT c.id, c.user_id, u.username, u.email,
+               c.card_type, c.last_four, c.expiry_date,
+               c.cardholder_name, c.is_default, c.created_at
+        FROM cards c
+        JOIN users u ON c.user_id = u.id
+        ORDER BY c.user_id, c.id
+    """,
+    "user_by_id": """
+        SELECT id, username, email, first_name, last_name,
+               address, city, state, zip_code, country, phone,
+               created_at, last_login
+        FROM users
+        WHERE id = ?
+    """,
+    "product_by_id": """
+        SELECT id, name, description, price, image,
+               category, inventory, created_at, updated_at
+        FROM products
+        WHERE id = ?
+    """,
+    "cards_by_user_id": """
+        SELECT c.id, c.user_id, c.card_type, c.last_four,
+               c.expiry_date, c.cardholder_name, c.is_default, c.created_at
+        FROM cards c
+        WHERE c.user_id = ?
+        ORDER BY c.is_default DESC, c.id
+    """,
+    "products_by_category": """
+        SELECT id, name, description, price, image,
+               category, inventory, created_at, updated_at
+        FROM products
+        WHERE category = ?
+        ORDER BY id
+    """,
+    "users_by_ids": """
+        SELECT id, username, email, first_name, last_name,
+               address, city, state, zip_code, country, phone,
+               created_at, last_login
+        FROM users
+        WHERE id IN ({ids})
+    """,
+    "products_by_ids": """
+        SELECT id, name, description, price, image,
+               category, inventory, created_at, updated_at
+        FROM products
+        WHERE id IN ({ids})
+    """,
+    "cards_by_user_ids": """
+        SELECT c.id, c.user_id, c.card_type, c.last_four,
+               c.expiry_date, c.cardholder_name, c.is_default, c.created_at
+        FROM cards c
+        WHERE c.user_id IN ({ids})
+        ORDER BY c.user_id, c.is_default DESC, c.id
+    """,
+    "users_page": """
+        SELECT id, username, email, first_name, last_name,
+               address, city, state, zip_code, country, phone,
+               created_at, last_login
+        FROM users
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+    """,
+    "products_page": """
+        SELECT id, name, description, price, image,
+               category, inventory, created_at, updated_at
+        FROM products
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+    """,
+    "cards_page": """
+        SELECT c.id, c.user_id, u.username, u.email,
+               c.card_type, c.last_four, c.expiry_date,
+               c.cardholder_name, c.is_default, c.created_at
+        FROM cards c
+        JOIN users u ON c.user_id = u.id
+        WHERE (c.user_id, c.id) > (?, ?)
+        ORDER BY c.user_id, c.id
+        LIMIT ?
+    """,
+    "category_summary": """
+        SELECT category,
+               COUNT(*) AS products,
+               SUM(inventory) AS units,
+               ROUND(SUM(price * inventory), 2) AS inventory_value,
+               ROUND(AVG(price), 2) AS average_price,
+               MIN(price) AS min_price,
+               MAX(price) AS max_price,
+               SUM(inventory <= 0) AS out_of_stock
+        FROM products
+        GROUP BY category
+        ORDER BY category
+    """,
+    # Nearest-rank percentiles: the value at position ceil(total * p / 100) for each p in the JSON list
+    "price_percentiles": """
+        WITH ranked AS (
+            SELECT price,
+                   ROW_NUMBER() OVER (ORDER BY price) AS position,
+                   COUNT(*) OVER () AS total
+            FROM products
+        )
+        SELECT position, total, price
+        FROM ranked
+        WHERE position IN (SELECT (total * value + 99) / 100 FROM json_each(?))
+    """,
+    "category_price_percentiles": """
+        WITH ranked AS (
+            SELECT price,
+                   ROW_NUMBER() OVER (ORDER BY price) AS position,
+                   COUNT(*) OVER () AS total
+            FROM products
+            WHERE category = ?
+        )
+        SELECT position, total, price
+        FROM ranked
+        WHERE position IN (SELECT (total * value + 99) / 100 FROM json_each(?))
+    """,
+    "low_inventory_products": """
+        SELECT id, name, category, price, inventory
+        FROM products
+        WHERE inventory <= ?
+        ORDER BY inventory, id
+        LIMIT ?
+    """,
+    "recently_updated_products": """
+        SELECT id, name, category, price, inventory, updated_at
+        FROM products
+        WHERE updated_at >= ?
+        ORDER BY updated_at DESC, id DESC
+        LIMIT ?
+    """
+}
+
+# Tables the queryTable tool may read: the columns it returns and the fields it may filter and sort on
+QUERYABLE_TABLES: Dict[str, Dict[str, tuple]] = {
+    "products": {
+        "columns": ("id", "name", "description", "price", "image",
+                    "category", "inventory", "created_at", "updated_at"),
+        "fields": ("id", "name", "price", "category", "inventory", "created_at", "updated_at")
+    },
+    "users": {
+        "columns": ("id", "username", "email", "first_name", "last_name",
+                    "address", "city", "state", "zip_code", "country", "phone",
+                    "created_at", "last_login"),
+        "fields": ("id", "username", "email", "city", "state", "zip_code", "country",
+                   "created_at", "last_login")
+    }
+}
+
+# Comparison operators accepted by the queryTable tool
+FILTER_OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "in", "between")
+
+# Queries that read or aggregate a whole table by design; a full scan in their plan is expected
+FULL_TABLE_QUERIES = {"all_users", "all_products", "all_cards", "category_summary", "price_percentiles"}
+
+# Queries that rank a whole table with a window function; their temporary sort is expected
+IN_MEMORY_SORT_QUERIES = {"price_percentiles"}
+
+# Results that grow with a table; caching them would mean holding a second copy of the table
+UNCACHED_QUERIES = {QUERIES["all_users"], QUERIES["all_products"], QUERIES["all_cards"]}
+
 
 class DatabaseConnector:
     """SQLite database connector for the e-commerce database."""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, pool: Optional[ConnectionPool] = None,
+                 cache: Optional[ResultCache] = None):
         """
         Initialize the connector with the path to the database.
 
         Args:
-            db_path: Path to the SQLite database. If None, uses default path.
+            db_path: Path to the SQLite database. If None, uses the pool's path or the default path.
+            pool: Connection pool to borrow connections from. If None, connections are opened per connector.
+            cache: Result cache for query results. If None, every call queries the database.
         """
         if db_path is None:
-            # Default path relative to the ecommerce site
-            self.db_path = "/Users/rishabhsharma/PycharmProjects/ecommerce-site/scripts/db/ecommerce.db"
+            self.db_path = pool.db_path if pool is not None else DEFAULT_DB_PATH
         else:
             self.db_path = db_path
 
+        self.pool = pool
+        self.cache = cache
         self.connection = None
 
     def connect(self) -> None:
-        """Establish a connection to the database."""
-        if not os.path.exists(self.db_path):
-            raise FileNotFoundError(f"Database file not found at: {self.db_path}")
+        """Establish a connection to the database, borrowing it from the pool if there is one."""
+        if self.pool is not None:
+            if self.connection is None:
+                self.connection = self.pool.acquire()
+            return
 
-        self.connection = sqlite3.connect(self.db_path)
-        # Configure SQLite connection to return rows as dictionaries
-        self.connection.row_factory = sqlite3.Row
+        # The connector only reads
+        self.connection = ConnectionProfile.from_env().connect(self.db_path)
 
     def disconnect(self) -> None:
-        """Close the database connection."""
+        """Close the database connection, or hand it back to the pool."""
         if self.connection:
-            self.connection.close()
+            if self.pool is not None:
+                self.pool.release(self.connection)
+            else:
+                self.connection.close()
             self.connection = None
 
     def _execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
@@ -52,67 +968,203 @@ class DatabaseConnector:
         Returns:
             List of dictionaries with query results
         """
+        if self.cache is None or query in UNCACHED_QUERIES:
+            # Built from the streaming path so only one copy of the result set is ever held
+            return list(self._iter_query(query, params))
+
+        return self._cached(("rows", query, params), lambda: list(self._iter_query(query, params)))
+
+    def _cached(self, key: Tuple, load: Callable[[], Any]) -> Any:
+        """Return the cached result for `key`, loading and caching it on a miss."""
+        version = self.cache.sync()
+        result = self.cache.get(key)
+        if result is None:
+            result = load()
+            self.cache.set(key, result, version)
+        return result
+
+    def _iter_query(self, query: str, params: tuple = (),
+                    chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a query and yield results as dictionaries, fetching `chunk_size` rows at a time.
+
+        Memory use is bounded by the chunk size and the first row is available as soon
+        as SQLite produces it. The connection stays busy until the iterator is exhausted
+        or closed.
+
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+            chunk_size: Number of rows fetched from SQLite per batch
+
+        Returns:
+            Iterator over dictionaries with query results
+        """
         if not self.connection:
             self.connect()
 
         cursor = self.connection.cursor()
-        cursor.execute(query, params)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                # Convert SQLite rows to dictionaries
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
+    def _execute_columnar(self, query: str, params: tuple = (),
+                          chunk_size: int = STREAM_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Execute a query and return results in columnar form.
 
-        # Convert SQLite rows to dictionaries
-        results = [dict(row) for row in cursor.fetchall()]
-        cursor.close()
+        Rows are kept as the cursor's tuples, so column names appear once per result
+        instead of once per row.
 
-        return results
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+            chunk_size: Number of rows fetched from SQLite per batch
 
-    def get_all_users(self) -> List[Dict[str, Any]]:
+        Returns:
+            Dictionary with the column names and a list of row value lists
         """
-        Retrieve all users from the database.
+        if self.cache is not None and query not in UNCACHED_QUERIES:
+            return self._cached(("columns", query, params), lambda: self._fetch_columnar(query, params, chunk_size))
+        return self._fetch_columnar(query, params, chunk_size)
+
+    def _fetch_columnar(self, query: str, params: tuple, chunk_size: int) -> Dict[str, Any]:
+        """Run a query for `_execute_columnar`, keeping rows as cursor tuples."""
+        if not self.connection:
+            self.connect()
+
+        cursor = self.connection.cursor()
+        # Plain tuples instead of sqlite3.Row for this cursor only
+        cursor.row_factory = None
+        try:
+            cursor.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            rows = []
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                rows.extend(chunk)
+            return {"columns": columns, "rows": rows}
+        finally:
+            cursor.close()
+
+    def iter_chunks(self, query: str, params: tuple = (), chunk_size: int = STREAM_CHUNK_SIZE,
+                    read_only: bool = False) -> Tuple[List[str], Iterator[List[tuple]]]:
+        """
+        Execute a query and stream its rows as lists of tuples, `chunk_size` rows at a time.
+
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+            chunk_size: Number of rows fetched from SQLite per batch
+            read_only: Make the query fail if it writes, attaches a database or passes a value
+                       to a pragma, whatever the connection profile
 
         Returns:
-            List of dictionaries containing user information
+            The column names and an iterator over row chunks; close the iterator to
+            release the cursor early
         """
-        query = """
-        SELECT id, username, email, first_name, last_name, 
-               address, city, state, zip_code, country, phone,
-               created_at, last_login
-        FROM users
-        ORDER BY id
+        if not self.connection:
+            self.connect()
+
+        cursor = self.connection.cursor()
+        # Plain tuples instead of sqlite3.Row for this cursor only
+        cursor.row_factory = None
+        query_only = None
+        if read_only:
+            # query_only makes any write fail; the authorizer stops the query from switching
+            # it off again or attaching other databases while the statement is compiled
+            query_only = self.connection.execute("PRAGMA query_only").fetchone()[0]
+            self.connection.execute("PRAGMA query_only = ON")
+            self.connection.set_authorizer(_read_only_authorizer)
+
+        def restore() -> None:
+            cursor.close()
+            if query_only is not None:
+                # A refused write leaves the implicit BEGIN open
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                self.connection.execute("PRAGMA query_only = %d" % query_only)
+
+        try:
+            try:
+                cursor.execute(query, params)
+            finally:
+                if read_only:
+                    self.connection.set_authorizer(None)
+        except BaseException:
+            restore()
+            raise
+        columns = [description[0] for description in cursor.description]
+
+        def chunks() -> Iterator[List[tuple]]:
+            try:
+                yield []
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                restore()
+
+        iterator = chunks()
+        # Start the generator so closing it restores the connection even if it is never iterated
+        next(iterator)
+        return columns, iterator
+
+    def get_all_users(self, columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
+        Retrieve all users from the database.
+
+        Args:
+            columnar: Return {"columns": [...], "rows": [[...], ...]} instead of one dictionary per row
 
+        Returns:
+            List of dictionaries containing user information, or the columnar form
+        """
+        query = QUERIES["all_users"]
+        if columnar:
+            return self._execute_columnar(query)
         return self._execute_query(query)
 
-    def get_all_products(self) -> List[Dict[str, Any]]:
+    def get_all_products(self, columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Retrieve all products from the database.
 
+        Args:
+            columnar: Return {"columns": [...], "rows": [[...], ...]} instead of one dictionary per row
+
         Returns:
-            List of dictionaries containing product information
-        """
-        query = """
-        SELECT id, name, description, price, image,
-               category, inventory, created_at, updated_at
-        FROM products
-        ORDER BY id
+            List of dictionaries containing product information, or the columnar form
         """
-
+        query = QUERIES["all_products"]
+        if columnar:
+            return self._execute_columnar(query)
         return self._execute_query(query)
 
-    def get_all_cards(self) -> List[Dict[str, Any]]:
+    def get_all_cards(self, columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Retrieve all payment cards from the database.
 
+        Args:
+            columnar: Return {"columns": [...], "rows": [[...], ...]} instead of one dictionary per row
+
         Returns:
-            List of dictionaries containing card information with associated user details
-        """
-        query = """
-        SELECT c.id, c.user_id, u.username, u.email,
-               c.card_type, c.last_four, c.expiry_date,
-               c.cardholder_name, c.is_default, c.created_at
-        FROM cards c
-        JOIN users u ON c.user_id = u.id
-        ORDER BY c.user_id, c.id
+            List of dictionaries containing card information with associated user details, or the columnar form
         """
-
+        query = QUERIES["all_cards"]
+        if columnar:
+            return self._execute_columnar(query)
         return self._execute_query(query)
 
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -125,14 +1177,7 @@ class DatabaseConnector:
         Returns:
             Dictionary with user information or None if not found
         """
-        query = """
-        SELECT id, username, email, first_name, last_name, 
-               address, city, state, zip_code, country, phone,
-               created_at, last_login
-        FROM users
-        WHERE id = ?
-        """
-
+        query = QUERIES["user_by_id"]
         results = self._execute_query(query, (user_id,))
         return results[0] if results else None
 
@@ -146,13 +1191,7 @@ class DatabaseConnector:
         Returns:
             Dictionary with product information or None if not found
         """
-        query = """
-        SELECT id, name, description, price, image,
-               category, inventory, created_at, updated_at
-        FROM products
-        WHERE id = ?
-        """
-
+        query = QUERIES["product_by_id"]
         results = self._execute_query(query, (product_id,))
         return results[0] if results else None
 
@@ -166,68 +1205,1220 @@ class DatabaseConnector:
         Returns:
             List of dictionaries containing card information
         """
-        query = """
-        SELECT c.id, c.user_id, c.card_type, c.last_four,
-               c.expiry_date, c.cardholder_name, c.is_default, c.created_at
-        FROM cards c
-        WHERE c.user_id = ?
-        ORDER BY c.is_default DESC, c.id
+        query = QUERIES["cards_by_user_id"]
+        return self._execute_query(query, (user_id,))
+
+    def get_products_by_category(self, category: str,
+                                 columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Retrieve all products in a specific category.
+
+        Args:
+            category: Product category to filter by
+            columnar: Return {"columns": [...], "rows": [[...], ...]} instead of one dictionary per row
+
+        Returns:
+            List of dictionaries containing product information, or the columnar form
+        """
+        query = QUERIES["products_by_category"]
+        if columnar:
+            return self._execute_columnar(query, (category,))
+        return self._execute_query(query, (category,))
+
+    def _execute_for_ids(self, query: str, ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Execute an `IN ({ids})` query for any number of IDs.
+
+        Duplicate IDs are dropped and the rest are bound in chunks of MAX_QUERY_VARIABLES,
+        so each chunk is a single query on the same connection.
+
+        Args:
+            query: SQL query containing an `{ids}` placeholder list
+            ids: IDs to bind
+
+        Returns:
+            List of dictionaries with the results of every chunk
+        """
+        ids = list(dict.fromkeys(ids))
+        results = []
+        for start in range(0, len(ids), MAX_QUERY_VARIABLES):
+            chunk = ids[start:start + MAX_QUERY_VARIABLES]
+            results.extend(self._execute_query(query.format(ids=", ".join("?" * len(chunk))), tuple(chunk)))
+        return results
+
+    def get_users_by_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Retrieve several users by ID.
+
+        Args:
+            user_ids: IDs of the users to retrieve
+
+        Returns:
+            Dictionary mapping each found user ID to the user's information
+        """
+        return {user["id"]: user for user in self._execute_for_ids(QUERIES["users_by_ids"], user_ids)}
+
+    def get_products_by_ids(self, product_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Retrieve several products by ID.
+
+        Args:
+            product_ids: IDs of the products to retrieve
+
+        Returns:
+            Dictionary mapping each found product ID to the product's information
+        """
+        return {product["id"]: product for product in self._execute_for_ids(QUERIES["products_by_ids"], product_ids)}
+
+    def get_cards_by_user_ids(self, user_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Retrieve the payment cards of several users.
+
+        Args:
+            user_ids: IDs of the users
+
+        Returns:
+            Dictionary mapping every requested user ID to that user's cards (empty if none)
+        """
+        cards = {user_id: [] for user_id in user_ids}
+        for card in self._execute_for_ids(QUERIES["cards_by_user_ids"], user_ids):
+            cards[card["user_id"]].append(card)
+        return cards
+
+    def get_category_summary(self) -> List[Dict[str, Any]]:
+        """
+        Summarize products per category.
+
+        Returns:
+            List of dictionaries, one per category, with the number of products, units in stock,
+            inventory value, average/min/max price and number of out-of-stock products
+        """
+        query = QUERIES["category_summary"]
+        return self._execute_query(query)
+
+    def get_price_percentiles(self, percentiles: List[int],
+                              category: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute product price percentiles using the nearest-rank method.
+
+        Args:
+            percentiles: Percentiles to compute, each between 1 and 100
+            category: Only consider products in this category; None considers all products
+
+        Returns:
+            Dictionary with the number of products considered and a mapping of each
+            percentile to its price (empty if there are no products)
+        """
+        if any(not 1 <= percentile <= 100 for percentile in percentiles):
+            raise ValueError("Percentiles must be between 1 and 100")
+
+        if category is None:
+            rows = self._execute_query(QUERIES["price_percentiles"], (json.dumps(percentiles),))
+        else:
+            rows = self._execute_query(QUERIES["category_price_percentiles"], (category, json.dumps(percentiles)))
+
+        if not rows:
+            return {"products": 0, "percentiles": {}}
+        total = rows[0]["total"]
+        prices = {row["position"]: row["price"] for row in rows}
+        return {
+            "products": total,
+            "percentiles": {percentile: prices[(total * percentile + 99) // 100] for percentile in percentiles}
+        }
+
+    def get_low_inventory_products(self, threshold: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Retrieve the products with the least stock.
+
+        Args:
+            threshold: Include products with at most this many units in stock
+            limit: Maximum number of products to return
+
+        Returns:
+            List of dictionaries with product id, name, category, price and inventory, lowest stock first
+        """
+        query = QUERIES["low_inventory_products"]
+        return self._execute_query(query, (threshold, limit))
+
+    def get_recently_updated_products(self, limit: int, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the most recently updated products.
+
+        Args:
+            limit: Maximum number of products to return
+            since: Only include products updated at or after this timestamp ("YYYY-MM-DD[ HH:MM:SS]")
+
+        Returns:
+            List of dictionaries with product id, name, category, price, inventory and updated_at, newest first
+        """
+        query = QUERIES["recently_updated_products"]
+        return self._execute_query(query, (since or "", limit))
+
+    def execute_filter_query(self, query: str, params: tuple) -> List[Dict[str, Any]]:
+        """
+        Run a query compiled by `build_filter_query`.
+
+        Args:
+            query: SQL query from build_filter_query
+            params: Its parameters
+
+        Returns:
+            List of dictionaries with the selected columns
+        """
+        return self._execute_query(query, params)
+
+    def get_users_page(self, limit: int, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the next page of users in ID order using keyset pagination.
+
+        Args:
+            limit: Maximum number of users to return
+            after_id: Return users with an ID greater than this; None starts at the beginning
+
+        Returns:
+            List of dictionaries containing user information
+        """
+        query = QUERIES["users_page"]
+        return self._execute_query(query, (after_id if after_id is not None else -1, limit))
+
+    def get_products_page(self, limit: int, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the next page of products in ID order using keyset pagination.
+
+        Args:
+            limit: Maximum number of products to return
+            after_id: Return products with an ID greater than this; None starts at the beginning
+
+        Returns:
+            List of dictionaries containing product information
+        """
+        query = QUERIES["products_page"]
+        return self._execute_query(query, (after_id if after_id is not None else -1, limit))
+
+    def get_cards_page(self, limit: int, after: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the next page of payment cards in (user_id, id) order using keyset pagination.
+
+        Args:
+            limit: Maximum number of cards to return
+            after: (user_id, card_id) of the last card already seen; None starts at the beginning
+
+        Returns:
+            List of dictionaries containing card information with associated user details
+        """
+        after_user_id, after_card_id = after if after is not None else (-1, -1)
+        query = QUERIES["cards_page"]
+        return self._execute_query(query, (after_user_id, after_card_id, limit))
+
+
+# Indexes the connector's filtered lookups and (user_id, id) ordering rely on
+RECOMMENDED_INDEXES = [
+    {"name": "idx_cards_user_id", "table": "cards", "columns": ("user_id", "id")},
+    {"name": "idx_products_category", "table": "products", "columns": ("category", "id")},
+    {"name": "idx_products_inventory", "table": "products", "columns": ("inventory", "id")},
+    {"name": "idx_products_updated_at", "table": "products", "columns": ("updated_at",)},
+    # Range filters and sorts offered by the queryTable tool
+    {"name": "idx_products_price", "table": "products", "columns": ("price", "id")},
+    {"name": "idx_users_country", "table": "users", "columns": ("country", "id")},
+    {"name": "idx_users_created_at", "table": "users", "columns": ("created_at",)}
+]
+
+
+class QueryPlanAuditor:
+    """Checks the query plan of every registered connector query and provisions missing indexes."""
+
+    def __init__(self, pool: ConnectionPool):
+        """
+        Initialize the auditor.
+
+        Args:
+            pool: Connection pool to explain queries on and create indexes through
+        """
+        self.pool = pool
+        self.created_indexes: List[str] = []
+
+        self._lock = threading.Lock()
+        # (query, data version) -> plan report for ad-hoc queries
+        self._plans: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a short-lived connection for the audit.
+
+        Pooled connections keep the schema and prepared EXPLAIN statements they have
+        already seen, so their plans would not reflect indexes created since.
+        """
+        connection = self.pool._open()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def explain(connection: sqlite3.Connection, query: str) -> List[str]:
+        """
+        Return the EXPLAIN QUERY PLAN details for a query.
+
+        Placeholders are bound to NULL; the plan only depends on the statement's shape.
+        """
+        query = query.replace("{ids}", "?")
+        params = (None,) * query.count("?")
+        rows = connection.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+        return [row["detail"] for row in rows]
+
+    @staticmethod
+    def _problems(name: str, query: str, plan: List[str]) -> List[str]:
+        """
+        Return the plan steps that indicate a full table scan or a sort of a scanned table.
+
+        A SCAN step, with or without an index, only stops early when nothing is filtered
+        out of it, the table is walked in the order asked for (no temporary sort) and the
+        query has a LIMIT. Otherwise it reads the whole table.
+        """
+        # Subqueries, CTEs and virtual tables such as json_each are not tables that need an index
+        derived = {detail.split(" ", 1)[1] for detail in plan if detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+        scans = [
+            detail for detail in plan
+            if detail.startswith("SCAN ") and "VIRTUAL TABLE" not in detail
+            and detail[len("SCAN "):].split(" USING ")[0] not in derived
+        ]
+        words = query.upper().split()
+        bounded = ("WHERE" not in words and "LIMIT" in words
+                   and not any(detail.startswith("USE TEMP B-TREE") for detail in plan))
+        problems = []
+        for detail in plan:
+            if detail in scans and not bounded and name not in FULL_TABLE_QUERIES:
+                problems.append(detail)
+            # Sorting the few rows an index search returns is cheap; sorting a scanned table is not
+            elif detail.startswith("USE TEMP B-TREE") and scans and name not in IN_MEMORY_SORT_QUERIES:
+                problems.append(detail)
+        return problems
+
+    @staticmethod
+    def missing_indexes(connection: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """
+        Return the recommended indexes with no existing index led by the same column.
+
+        An index on the leading column alone is enough, since SQLite appends the rowid
+        (the tables' integer primary key) to every index entry.
+        """
+        missing = []
+        for index in RECOMMENDED_INDEXES:
+            leading_columns = set()
+            for entry in connection.execute("PRAGMA index_list(%s)" % index["table"]).fetchall():
+                columns = connection.execute("PRAGMA index_info(%s)" % entry["name"]).fetchall()
+                if columns:
+                    leading_columns.add(min(columns, key=lambda column: column["seqno"])["name"])
+            if index["columns"][0] not in leading_columns:
+                missing.append(index)
+        return missing
+
+    def audit(self) -> Dict[str, Any]:
+        """
+        Explain every registered query and list missing recommended indexes.
+
+        Returns:
+            Dict[str, Any]: Per-query plans and problems, plus the missing and created indexes
+        """
+        queries = {}
+        with self._connection() as connection:
+            for name, query in QUERIES.items():
+                try:
+                    plan = self.explain(connection, query)
+                except sqlite3.Error as e:
+                    queries[name] = {"status": "error", "message": str(e)}
+                    continue
+                problems = self._problems(name, query, plan)
+                queries[name] = {
+                    "status": "needs_index" if problems else "ok",
+                    "plan": plan,
+                    "problems": problems
+                }
+            missing = self.missing_indexes(connection)
+
+        return {
+            "queries": queries,
+            "missing_indexes": [index["name"] for index in missing],
+            "created_indexes": list(self.created_indexes)
+        }
+
+    def explain_query(self, query: str, connection: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        """
+        Explain an ad-hoc query, such as one built by `build_filter_query`.
+
+        Reports are cached per schema version: data changes never change a plan, so
+        writes from the site do not cause the query to be explained again.
+
+        Args:
+            query: SQL query to explain
+            connection: Connection to explain on, such as the one the query will run on;
+                        None borrows a reader from the pool
+
+        Returns:
+            Dict[str, Any]: The plan and the steps that scan a whole table or sort a scanned table
+        """
+        if connection is None:
+            with self.pool.reader() as connection:
+                return self.explain_query(query, connection)
+
+        version = connection.execute("PRAGMA schema_version").fetchone()[0]
+        key = (query, version)
+        with self._lock:
+            report = self._plans.get(key)
+        if report is not None:
+            return report
+
+        # EXPLAIN never opens a read transaction, so neither the connection's copy of the
+        # schema nor a cached EXPLAIN statement would notice a new index: read the schema
+        # to reload it, and tag the statement with the version so it is prepared afresh
+        connection.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        plan = self.explain(connection, "/* schema %d */ %s" % (version, query))
+        report = {"plan": plan, "problems": self._problems("", query, plan)}
+        with self._lock:
+            if len(self._plans) >= 256:
+                self._plans.clear()
+            self._plans[key] = report
+        return report
+
+    def create_missing_indexes(self) -> List[str]:
+        """
+        Create the missing recommended indexes through the pool's writer.
+
+        Returns:
+            List[str]: Names of the indexes that were created
+        """
+        with self._connection() as connection:
+            missing = self.missing_indexes(connection)
+
+        created = []
+        with self.pool.writer() as connection:
+            for index in missing:
+                connection.execute("CREATE INDEX IF NOT EXISTS %s ON %s (%s)" % (
+                    index["name"], index["table"], ", ".join(index["columns"])
+                ))
+                created.append(index["name"])
+            if created:
+                # Refresh the planner statistics so the new indexes are picked up
+                connection.execute("ANALYZE")
+        self.created_indexes.extend(created)
+        return created
+
+    def check(self, create_indexes: bool = False) -> Dict[str, Any]:
+        """
+        Audit the registered queries, optionally creating missing indexes first, and log problems.
+
+        Args:
+            create_indexes: Whether to create the missing recommended indexes
+
+        Returns:
+            Dict[str, Any]: The audit report
+        """
+        if create_indexes:
+            for name in self.create_missing_indexes():
+                logger.info("Created index %s on %s", name, self.pool.db_path)
+
+        report = self.audit()
+        for name, result in report["queries"].items():
+            if result["status"] == "error":
+                logger.warning("Could not explain query %s: %s", name, result["message"])
+            elif result["problems"]:
+                logger.warning("Query %s: %s", name, "; ".join(result["problems"]))
+        if report["missing_indexes"]:
+            logger.warning(
+                "Missing recommended indexes: %s (set ECOMMERCE_DB_AUTO_INDEX=1 to create them)",
+                ", ".join(report["missing_indexes"])
+            )
+        return report
+
+
+class ProductSearchIndex:
+    """FTS5 full-text index over product name, description and category, kept in sync by triggers."""
+
+    # External-content table: the index stores only tokens and reads column values from products.
+    # The update trigger only fires for the indexed columns, so price and stock writes skip the index.
+    SCHEMA = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name, description, category,
+            content='products', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts(rowid, name, description, category)
+            VALUES (new.id, new.name, new.description, new.category);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description, category)
+            VALUES ('delete', old.id, old.name, old.description, old.category);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description, category ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description, category)
+            VALUES ('delete', old.id, old.name, old.description, old.category);
+            INSERT INTO products_fts(rowid, name, description, category)
+            VALUES (new.id, new.name, new.description, new.category);
+        END
+        """
+    ]
+
+    SEARCH_QUERY = """
+        SELECT p.id, p.name, p.description, p.price, p.image,
+               p.category, p.inventory, p.created_at, p.updated_at,
+               bm25(products_fts) AS rank,
+               snippet(products_fts, -1, '[', ']', '...', 12) AS snippet
+        FROM products_fts
+        JOIN products p ON p.id = products_fts.rowid
+        WHERE products_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        """
+        Initialize the search index.
+
+        Args:
+            pool: Connection pool to search with and create the index through
+        """
+        self.pool = pool
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def ensure(self) -> bool:
+        """
+        Create the FTS5 table and its triggers if they do not exist yet.
+
+        A newly created index is populated from the products table, and an update trigger
+        that fires on every column is replaced.
+
+        Returns:
+            bool: True if the index was created by this call
         """
+        if self._ready:
+            return False
+        with self._lock:
+            if self._ready:
+                return False
+            with self.pool.writer() as connection:
+                exists = connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+                ).fetchone() is not None
+                trigger = connection.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'products_fts_update'"
+                ).fetchone()
+                if trigger is not None and "UPDATE OF" not in trigger[0].upper():
+                    # Replace a trigger from before it was limited to the indexed columns
+                    connection.execute("DROP TRIGGER products_fts_update")
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+                if not exists:
+                    connection.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+            self._ready = True
+            return not exists
+
+    @staticmethod
+    def match_expression(text: str) -> str:
+        """
+        Turn free text into an FTS5 query matching every word, the last one as a prefix.
+
+        Words are quoted so punctuation and FTS5 operators in the input are matched literally.
+        """
+        terms = ['"%s"' % word.replace('"', '""') for word in text.split()]
+        if terms:
+            terms[-1] += "*"
+        return " ".join(terms)
+
+    def search(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search products by name, description and category.
+
+        Args:
+            text: Words to search for
+            limit: Maximum number of products to return
+
+        Returns:
+            List of product dictionaries ordered by relevance, each with its bm25 `rank`
+            (lower is better) and a `snippet` with the matched words in brackets
+        """
+        expression = self.match_expression(text)
+        if not expression:
+            return []
+        self.ensure()
+        with self.pool.reader() as connection:
+            rows = connection.execute(self.SEARCH_QUERY, (expression, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+class QueryExecutor:
+    """Runs blocking database calls on a bounded thread pool so they never block the event loop."""
+
+    def __init__(self, pool: ConnectionPool, max_workers: int = 4, timeout: float = 30.0):
+        """
+        Initialize the executor.
+
+        Args:
+            pool: Connection pool the calls borrow from, used to interrupt them
+            max_workers: Maximum number of calls running at once; further calls queue
+            timeout: Default seconds a call may take before it is interrupted
+        """
+        self.pool = pool
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ecommerce-db")
+        self._lock = threading.Lock()
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    async def run(self, function: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run `function(*args)` on a worker thread and await its result.
+
+        If the call times out or the awaiting task is cancelled, a call that has not
+        started yet is dropped and a running one has its SQLite statements interrupted.
+
+        Args:
+            function: Blocking callable to run
+            timeout: Seconds to wait; None uses the executor's default
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            TimeoutError: If the call did not finish within the timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        job = {"thread": None, "abandoned": False}
+        job_lock = threading.Lock()
+
+        def call() -> Any:
+            with job_lock:
+                if job["abandoned"]:
+                    return None
+                job["thread"] = threading.get_ident()
+            with self._lock:
+                self._running += 1
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                # Waits for an interrupt in progress, so it cannot hit this thread's next call
+                with job_lock:
+                    job["thread"] = None
+
+        def abandon() -> None:
+            with job_lock:
+                job["abandoned"] = True
+                if job["thread"] is not None:
+                    self.pool.interrupt(job["thread"])
+
+        self._count("submitted")
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        try:
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            abandon()
+            self._count("timed_out")
+            raise TimeoutError(f"Database call did not finish within {timeout} seconds")
+        except asyncio.CancelledError:
+            abandon()
+            self._count("cancelled")
+            raise
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("completed")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker count, running calls, timeout and call counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "timeout": self.timeout
+            }
+
+
+def encode_cursor(table: str, key: Any) -> str:
+    """Encode the last key of a page into an opaque continuation token."""
+    payload = json.dumps({"table": table, "after": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(table: str, cursor: Optional[str]) -> Any:
+    """
+    Decode a continuation token produced by `encode_cursor` for `table`.
+
+    Returns:
+        The last key of the previous page: an ID, or a (user_id, card_id) pair for cards;
+        None for an empty cursor or "start"
+
+    Raises:
+        ValueError: If the token is malformed or belongs to another table
+    """
+    if not cursor or cursor == "start":
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(payload, dict) or payload.get("table") != table:
+        raise ValueError(f"Cursor does not belong to {table}: {cursor}")
+
+    def is_id(value: Any) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    after = payload.get("after")
+    if table == "cards":
+        if not isinstance(after, list) or len(after) != 2 or not all(is_id(value) for value in after):
+            raise ValueError("Invalid cursor")
+        return tuple(after)
+    if not is_id(after):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def build_filter_query(table: str, filters: List[Dict[str, Any]], sort_by: Optional[str] = None,
+                       descending: bool = False, limit: int = DEFAULT_PAGE_SIZE,
+                       fields: Optional[List[str]] = None) -> Tuple[str, tuple]:
+    """
+    Compile a filter/sort/limit request into a parameterised query.
+
+    Table, field and operator names are checked against QUERYABLE_TABLES and
+    FILTER_OPERATORS; values are always bound as parameters.
+
+    Args:
+        table: "products" or "users"
+        filters: Conditions combined with AND, each {"field": ..., "op": ..., "value": ...};
+                 "in" takes a list of values and "between" a [low, high] pair
+        sort_by: Field to sort on; rows are always ordered by id as well, so results are stable
+        descending: Sort in descending order
+        limit: Maximum number of rows, clamped to 1..MAX_PAGE_SIZE
+        fields: Columns to return; None returns every column
+
+    Returns:
+        Tuple[str, tuple]: The SQL query and its parameters
+
+    Raises:
+        ValueError: If the request names an unknown table, field or operator or has malformed values
+    """
+    if table not in QUERYABLE_TABLES:
+        raise ValueError(f"Unknown table: {table}. Expected one of: {', '.join(QUERYABLE_TABLES)}")
+    columns = QUERYABLE_TABLES[table]["columns"]
+    allowed = QUERYABLE_TABLES[table]["fields"]
+
+    selected = list(fields) if fields else list(columns)
+    unknown = [field for field in selected if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(unknown)}")
+
+    conditions = []
+    params: List[Any] = []
+    for condition in filters:
+        field, operator, value = condition.get("field"), condition.get("op", "="), condition.get("value")
+        if field not in allowed:
+            raise ValueError(f"Cannot filter {table} on {field}. Allowed fields: {', '.join(allowed)}")
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown operator {operator}. Allowed operators: {', '.join(FILTER_OPERATORS)}")
+
+        values = value if operator in ("in", "between") else [value]
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Operator {operator} on {field} expects a non-empty list of values")
+        if operator == "between" and len(values) != 2:
+            raise ValueError(f"Operator between on {field} expects [low, high]")
+        if len(values) > MAX_QUERY_VARIABLES // 2:
+            raise ValueError(f"Too many values for {field}")
+        if any(not isinstance(item, (str, int, float)) or isinstance(item, bool) for item in values):
+            raise ValueError(f"Values for {field} must be strings or numbers")
+
+        if operator == "in":
+            conditions.append("%s IN (%s)" % (field, ", ".join("?" * len(values))))
+        elif operator == "between":
+            conditions.append("%s BETWEEN ? AND ?" % field)
+        else:
+            conditions.append("%s %s ?" % (field, operator))
+        params.extend(values)
+
+    direction = "DESC" if descending else "ASC"
+    if sort_by is None or sort_by == "id":
+        order = "id %s" % direction
+    elif sort_by in allowed:
+        order = "%s %s, id %s" % (sort_by, direction, direction)
+    else:
+        raise ValueError(f"Cannot sort {table} on {sort_by}. Allowed fields: {', '.join(allowed)}")
+
+    query = "SELECT %s FROM %s" % (", ".join(selected), table)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY %s LIMIT ?" % order
+    params.append(max(1, min(limit, MAX_PAGE_SIZE)))
+    return query, tuple(params)
+
+
+async def _paginate(table: str, limit: Optional[int], after: Optional[str], fetch_page) -> Dict[str, Any]:
+    """
+    Fetch one keyset page and build its response.
+
+    Args:
+        table: Table the cursor belongs to
+        limit: Requested page size, clamped to 1..MAX_PAGE_SIZE
+        after: Continuation token from the previous page
+        fetch_page: Callable (connector, limit, after_key) returning rows
+
+    Returns:
+        Dict[str, Any]: The page's items and the token for the next page (None on the last page)
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    after_key = decode_cursor(table, after)
+
+    # Fetch one extra row to learn whether another page follows
+    rows = await run_query(lambda connector: fetch_page(connector, limit + 1, after_key))
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        key = [last["user_id"], last["id"]] if table == "cards" else last["id"]
+        next_cursor = encode_cursor(table, key)
+
+    return {
+        "items": items,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
+
+
+def export_query(connector: DatabaseConnector, query: str, path: str, params: tuple = (),
+                 file_format: str = "ndjson", compression: Optional[str] = None,
+                 chunk_size: int = STREAM_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Stream the results of a query to a file in constant memory.
+
+    Args:
+        connector: Connected (or connectable) database connector
+        query: SQL query to export; statements that write fail with sqlite3.Error
+        path: File to write
+        params: Parameters for the query
+        file_format: "ndjson", "csv" or "parquet"
+        compression: For NDJSON and CSV, one of EXPORT_COMPRESSION or None; for Parquet, the
+                     column codec (one of PARQUET_COMPRESSION, default snappy)
+        chunk_size: Number of rows fetched from SQLite per batch
+
+    Returns:
+        Dict[str, Any]: The file path, format, number of rows, bytes written, elapsed seconds and throughput
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format {file_format!r}; expected one of {list(EXPORT_FORMATS)}")
+    if file_format == "parquet":
+        if compression is not None and compression not in PARQUET_COMPRESSION:
+            raise ValueError(f"Unknown Parquet compression {compression!r}; expected one of {list(PARQUET_COMPRESSION)}")
+    elif compression is not None and compression not in EXPORT_COMPRESSION:
+        raise ValueError(f"Unknown compression {compression!r}; expected one of {sorted(EXPORT_COMPRESSION)}")
+
+    started = time.monotonic()
+    columns, chunks = connector.iter_chunks(query, params, chunk_size=chunk_size, read_only=True)
+    try:
+        if file_format == "parquet":
+            rows = _write_parquet(path, columns, chunks, compression)
+        else:
+            opener = EXPORT_COMPRESSION[compression][0] if compression else open
+            with opener(path, "wt", encoding="utf-8", newline="") as output:
+                if file_format == "csv":
+                    rows = _write_csv(output, columns, chunks)
+                else:
+                    rows = _write_ndjson(output, columns, chunks)
+    finally:
+        chunks.close()
+
+    seconds = time.monotonic() - started
+    size = os.path.getsize(path)
+    return {
+        "path": path,
+        "format": file_format,
+        "compression": compression,
+        "rows": rows,
+        "bytes": size,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+        "mb_per_second": round(size / 1_000_000 / seconds, 2) if seconds else None
+    }
+
+
+def export_table(connector: DatabaseConnector, table: str, path: str,
+                 chunk_size: int = STREAM_CHUNK_SIZE, file_format: str = "ndjson",
+                 compression: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Stream a whole table to a file in constant memory.
+
+    Args:
+        connector: Connected (or connectable) database connector
+        table: One of "users", "products" or "cards"
+        path: File to write
+        chunk_size: Number of rows fetched from SQLite per batch
+        file_format: "ndjson", "csv" or "parquet"
+        compression: Compression, see `export_query`
+
+    Returns:
+        Dict[str, Any]: The file path, format, number of rows, bytes written, elapsed seconds and throughput
+    """
+    queries = {
+        "users": QUERIES["all_users"],
+        "products": QUERIES["all_products"],
+        "cards": QUERIES["all_cards"]
+    }
+    if table not in queries:
+        raise ValueError(f"Unknown table {table!r}; expected one of {sorted(queries)}")
+
+    return export_query(connector, queries[table], path, file_format=file_format,
+                        compression=compression, chunk_size=chunk_size)
+
+
+def export_file_name(name: str, file_format: str = "ndjson", compression: Optional[str] = None) -> str:
+    """Return the default export file name, e.g. users.csv.gz."""
+    suffix = EXPORT_COMPRESSION[compression][1] if compression in EXPORT_COMPRESSION and file_format != "parquet" else ""
+    return f"{name}.{file_format}{suffix}"
+
+
+def _write_ndjson(output, columns: List[str], chunks: Iterator[List[tuple]]) -> int:
+    rows = 0
+    for chunk in chunks:
+        output.writelines(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in chunk)
+        rows += len(chunk)
+    return rows
+
+
+def _write_csv(output, columns: List[str], chunks: Iterator[List[tuple]]) -> int:
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    rows = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        rows += len(chunk)
+    return rows
+
+
+def _write_parquet(path: str, columns: List[str], chunks: Iterator[List[tuple]],
+                   compression: Optional[str]) -> int:
+    """
+    Write chunks to a Parquet file, one row group per PARQUET_ROW_GROUP_SIZE rows.
+
+    Column types are inferred per row group: integers, floats (also for columns mixing
+    integers and floats), bytes or strings; columns with no values are null. SQLite columns
+    are loosely typed, so when a later row group needs a wider type (floats in an integer
+    column, text in a numeric one) the row groups already written are rewritten with the
+    widened schema, one group at a time. Bytes never mix with other types.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet export requires pyarrow: pip install pyarrow")
+
+    def column_type(values: tuple):
+        kinds = {type(value) for value in values if value is not None}
+        if not kinds:
+            return pyarrow.null()
+        if kinds <= {int}:
+            return pyarrow.int64()
+        if kinds <= {int, float}:
+            return pyarrow.float64()
+        if kinds == {bytes}:
+            return pyarrow.binary()
+        if bytes in kinds:
+            raise ValueError("Cannot export a column mixing bytes with other types to Parquet")
+        return pyarrow.string()
+
+    def widen(name: str, current, required):
+        if current == required or required == pyarrow.null():
+            return current
+        if current == pyarrow.null():
+            return required
+        if {current, required} == {pyarrow.int64(), pyarrow.float64()}:
+            return pyarrow.float64()
+        if pyarrow.binary() in (current, required):
+            raise ValueError(f"Cannot export column {name!r} to Parquet: it mixes bytes with other types")
+        return pyarrow.string()
+
+    def to_array(values: tuple, arrow_type):
+        if arrow_type == pyarrow.string():
+            values = [None if value is None else str(value) for value in values]
+        elif arrow_type == pyarrow.float64():
+            values = [None if value is None else float(value) for value in values]
+        return pyarrow.array(values, type=arrow_type)
+
+    def open_writer(target_schema):
+        return pyarrow.parquet.ParquetWriter(path, target_schema, compression=compression or "snappy")
+
+    def rewrite(target_schema):
+        # Row groups already on disk were written with the narrower schema; cast them over
+        writer.close()
+        previous = path + ".widening"
+        os.replace(path, previous)
+        try:
+            with pyarrow.parquet.ParquetFile(previous) as source:
+                widened = open_writer(target_schema)
+                try:
+                    for index in range(source.num_row_groups):
+                        widened.write_table(source.read_row_group(index).cast(target_schema))
+                except BaseException:
+                    widened.close()
+                    raise
+        finally:
+            os.remove(previous)
+        return widened
+
+    writer = None
+    schema = None
+    rows = 0
+    buffered: List[tuple] = []
+
+    def flush() -> None:
+        nonlocal writer, schema
+        values = list(zip(*buffered)) if buffered else [() for _ in columns]
+        required = pyarrow.schema([(name, column_type(column)) for name, column in zip(columns, values)])
+        if writer is None:
+            schema = required
+            writer = open_writer(schema)
+        else:
+            widened = pyarrow.schema([(name, widen(name, current, needed))
+                                      for name, current, needed in zip(columns, schema.types, required.types)])
+            if not widened.equals(schema):
+                schema = widened
+                writer = rewrite(schema)
+        arrays = [to_array(column, field.type) for column, field in zip(values, schema)]
+        writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+        buffered.clear()
+
+    try:
+        for chunk in chunks:
+            buffered.extend(chunk)
+            rows += len(chunk)
+            if len(buffered) >= PARQUET_ROW_GROUP_SIZE:
+                flush()
+        if buffered or writer is None:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _export_path(file_name: str) -> str:
+    """Resolve an export file name inside ECOMMERCE_EXPORT_DIR, refusing paths that escape it."""
+    export_dir = os.path.abspath(os.environ.get("ECOMMERCE_EXPORT_DIR", "exports"))
+    path = os.path.abspath(os.path.join(export_dir, file_name))
+    if os.path.dirname(path) != export_dir:
+        raise ValueError(f"Export file name must not contain directories: {file_name}")
+    os.makedirs(export_dir, exist_ok=True)
+    return path
+
+
+def _read_only_authorizer(action: int, argument: Optional[str], value: Optional[str],
+                          database: Optional[str], source: Optional[str]) -> int:
+    """SQLite authorizer for exported queries: no ATTACH/DETACH and no pragmas given a value."""
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_PRAGMA and value is not None:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+_connection_pool: Optional[ConnectionPool] = None
+_connection_pool_lock = threading.Lock()
+_query_plan_auditor: Optional[QueryPlanAuditor] = None
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Helper function to get the process-wide connection pool
+def get_connection_pool() -> ConnectionPool:
+    global _connection_pool, _query_plan_auditor
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            profile = ConnectionProfile.from_env()
+            try:
+                profile.prepare_database(DEFAULT_DB_PATH)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Could not prepare %s: %s", DEFAULT_DB_PATH, e)
+
+            options = {
+                "size": int(os.environ.get("ECOMMERCE_DB_POOL_SIZE", "4")),
+                "health_check_interval": float(os.environ.get("ECOMMERCE_DB_HEALTH_CHECK_INTERVAL", "30")),
+                "profile": profile
+            }
+            if _env_flag("ECOMMERCE_DB_SNAPSHOT", False):
+                _connection_pool = SnapshotPool(
+                    DEFAULT_DB_PATH,
+                    poll_interval=float(os.environ.get("ECOMMERCE_DB_SNAPSHOT_INTERVAL", "1")),
+                    **options
+                )
+            else:
+                _connection_pool = ConnectionPool(DEFAULT_DB_PATH, **options)
+            _query_plan_auditor = QueryPlanAuditor(_connection_pool)
+            if _env_flag("ECOMMERCE_DB_AUDIT_ON_STARTUP", True):
+                try:
+                    _query_plan_auditor.check(
+                        create_indexes=_env_flag("ECOMMERCE_DB_AUTO_INDEX", False)
+                    )
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning("Query plan audit failed: %s", e)
+        return _connection_pool
+
+
+# Helper function to get the auditor bound to the process-wide connection pool
+def get_query_plan_auditor() -> QueryPlanAuditor:
+    get_connection_pool()
+    return _query_plan_auditor
+
+
+_product_search_index: Optional[ProductSearchIndex] = None
+
+
+# Helper function to get the process-wide product search index
+def get_product_search_index() -> ProductSearchIndex:
+    global _product_search_index
+    pool = get_connection_pool()
+    with _connection_pool_lock:
+        if _product_search_index is None:
+            _product_search_index = ProductSearchIndex(pool)
+        return _product_search_index
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+# Helper function to get the process-wide query result cache
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    pool = get_connection_pool()
+    with _connection_pool_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(
+                pool,
+                max_entries=int(os.environ.get("ECOMMERCE_RESULT_CACHE_MAX_ENTRIES", "1024")),
+                max_bytes=int(os.environ.get("ECOMMERCE_RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+            )
+        return _result_cache
+
+
+# Helper function to get database connector
+def get_db_connector():
+    return DatabaseConnector(pool=get_connection_pool(), cache=get_result_cache())
+
+
+_query_executor: Optional[QueryExecutor] = None
+
+
+# Helper function to get the process-wide executor for database calls
+def get_query_executor() -> QueryExecutor:
+    global _query_executor
+    pool = get_connection_pool()
+    with _connection_pool_lock:
+        if _query_executor is None:
+            _query_executor = QueryExecutor(
+                pool,
+                # One worker per pooled connection, so workers never wait for a connection
+                max_workers=int(os.environ.get("ECOMMERCE_DB_EXECUTOR_WORKERS", str(pool.size))),
+                timeout=float(os.environ.get("ECOMMERCE_DB_QUERY_TIMEOUT", "30"))
+            )
+        return _query_executor
+
+
+async def ensure_connection_pool() -> None:
+    """
+    Create the process-wide connection pool on a worker thread if it does not exist yet.
 
-        return self._execute_query(query, (user_id,))
+    Creating it prepares the database, runs the startup audit (possibly building indexes)
+    and, in snapshot mode, copies the whole database, so async code awaits this before
+    using the synchronous getters instead of doing that work on the event loop.
+    """
+    if _connection_pool is None:
+        await asyncio.to_thread(get_connection_pool)
 
-    def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
-        """
-        Retrieve all products in a specific category.
 
-        Args:
-            category: Product category to filter by
+async def run_query(function: Callable[[DatabaseConnector], Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run `function(connector)` with a pooled connector on the query executor.
 
-        Returns:
-            List of dictionaries containing product information
-        """
-        query = """
-        SELECT id, name, description, price, image,
-               category, inventory, created_at, updated_at
-        FROM products
-        WHERE category = ?
-        ORDER BY id
-        """
+    Args:
+        function: Callable taking a connected DatabaseConnector
+        timeout: Seconds the call may take; None uses the executor's default
 
-        return self._execute_query(query, (category,))
+    Returns:
+        The callable's return value
+    """
+    def call() -> Any:
+        connector = get_db_connector()
+        try:
+            connector.connect()
+            return function(connector)
+        finally:
+            connector.disconnect()
 
+    await ensure_connection_pool()
+    return await get_query_executor().run(call, timeout=timeout)
+
+
+_database_statistics: Optional[DatabaseStatistics] = None
 
-# Helper function to get database connector
-def get_db_connector():
-    return DatabaseConnector()
+
+# Helper function to get the process-wide statistics cache
+def get_database_statistics() -> DatabaseStatistics:
+    global _database_statistics
+    pool = get_connection_pool()
+    with _connection_pool_lock:
+        if _database_statistics is None:
+            _database_statistics = DatabaseStatistics(pool)
+        return _database_statistics
 
 
 # Define the MCP interface for database operations
 
 @mcp.resource("config://database")
-def get_database_info() -> Dict[str, Any]:
+async def get_database_info() -> Dict[str, Any]:
     """
     Get information about the connected database.
 
     Returns:
         Dict[str, Any]: Database information
     """
-    connector = get_db_connector()
+    await ensure_connection_pool()
+    statistics = get_database_statistics()
     try:
-        connector.connect()
-
-        # Get counts of each entity type
-        user_count = len(connector.get_all_users())
-        product_count = len(connector.get_all_products())
-        card_count = len(connector.get_all_cards())
+        # Counts come from cached SQL aggregates, recomputed only after the data changes
+        counts = (await get_query_executor().run(statistics.get))["counts"]
 
         return {
             "status": "connected",
-            "database_path": connector.db_path,
+            "database_path": statistics.pool.db_path,
             "counts": {
-                "users": user_count,
-                "products": product_count,
-                "cards": card_count
+                "users": counts["users"],
+                "products": counts["products"],
+                "cards": counts["cards"]
             }
         }
     except Exception as e:
@@ -235,60 +2426,142 @@ def get_database_info() -> Dict[str, Any]:
             "status": "error",
             "message": str(e)
         }
-    finally:
-        connector.disconnect()
+
+
+@mcp.resource("config://database/statistics")
+async def get_database_statistics_resource() -> Dict[str, Any]:
+    """
+    Get aggregate statistics about the database.
+
+    Returns:
+        Dict[str, Any]: Row counts, per-category product counts and inventory,
+                        inventory totals and the distribution of cards per user
+    """
+    await ensure_connection_pool()
+    statistics = get_database_statistics()
+    return {
+        **(await get_query_executor().run(statistics.get)),
+        "cache": statistics.cache_info()
+    }
+
+
+@mcp.resource("config://database/pool")
+async def get_connection_pool_stats() -> Dict[str, Any]:
+    """
+    Get connection pool statistics.
+
+    Returns:
+        Dict[str, Any]: Pool size, idle connections and checkout counters
+    """
+    await ensure_connection_pool()
+    return get_connection_pool().stats()
+
+
+@mcp.resource("config://database/cache")
+async def get_result_cache_stats() -> Dict[str, Any]:
+    """
+    Get query result cache statistics.
+
+    Returns:
+        Dict[str, Any]: Hit/miss/eviction counters, memory use and the data version of the cached results
+    """
+    await ensure_connection_pool()
+    return get_result_cache().stats()
+
+
+@mcp.resource("config://database/executor")
+async def get_query_executor_stats() -> Dict[str, Any]:
+    """
+    Get query executor statistics.
+
+    Returns:
+        Dict[str, Any]: Worker count, running calls, default timeout and call counters
+    """
+    await ensure_connection_pool()
+    return get_query_executor().stats()
+
+
+@mcp.resource("config://database/query-plans")
+async def get_query_plans() -> Dict[str, Any]:
+    """
+    Audit the query plans of the connector's registered queries.
+
+    Returns:
+        Dict[str, Any]: Per-query plans, steps that scan a whole table or sort in a
+                        temporary b-tree, and missing recommended indexes
+    """
+    await ensure_connection_pool()
+    return await get_query_executor().run(get_query_plan_auditor().audit)
 
 
 @mcp.resource("resource://ecommerce/users")
-def getAllUsersFromDatabase() -> List[Dict[str, Any]]:
+async def getAllUsersFromDatabase() -> List[Dict[str, Any]]:
     """
     Retrieve all users from the database.
 
     Returns:
         List[Dict[str, Any]]: All users in the database
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
-        return connector.get_all_users()
-    finally:
-        connector.disconnect()
+    return await run_query(lambda connector: connector.get_all_users())
 
 
 @mcp.resource("resource://ecommerce/products")
-def getAllProductsFromDatabase() -> List[Dict[str, Any]]:
+async def getAllProductsFromDatabase() -> List[Dict[str, Any]]:
     """
     Retrieve all products from the database.
 
     Returns:
         List[Dict[str, Any]]: All products in the database
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
-        return connector.get_all_products()
-    finally:
-        connector.disconnect()
+    return await run_query(lambda connector: connector.get_all_products())
 
 
 @mcp.resource("resource://ecommerce/cards")
-def getAllCardsFromDatabase() -> List[Dict[str, Any]]:
+async def getAllCardsFromDatabase() -> List[Dict[str, Any]]:
     """
     Retrieve all payment cards from the database.
 
     Returns:
         List[Dict[str, Any]]: All cards in the database with associated user information
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
-        return connector.get_all_cards()
-    finally:
-        connector.disconnect()
+    return await run_query(lambda connector: connector.get_all_cards())
+
+
+@mcp.resource("resource://ecommerce/users/columnar")
+async def getAllUsersColumnarFromDatabase() -> Dict[str, Any]:
+    """
+    Retrieve all users from the database in columnar form.
+
+    Returns:
+        Dict[str, Any]: Column names and one list of values per user
+    """
+    return await run_query(lambda connector: connector.get_all_users(columnar=True))
+
+
+@mcp.resource("resource://ecommerce/products/columnar")
+async def getAllProductsColumnarFromDatabase() -> Dict[str, Any]:
+    """
+    Retrieve all products from the database in columnar form.
+
+    Returns:
+        Dict[str, Any]: Column names and one list of values per product
+    """
+    return await run_query(lambda connector: connector.get_all_products(columnar=True))
+
+
+@mcp.resource("resource://ecommerce/cards/columnar")
+async def getAllCardsColumnarFromDatabase() -> Dict[str, Any]:
+    """
+    Retrieve all payment cards from the database in columnar form.
+
+    Returns:
+        Dict[str, Any]: Column names and one list of values per card, including user information
+    """
+    return await run_query(lambda connector: connector.get_all_cards(columnar=True))
 
 
 @mcp.resource("resource://ecommerce/users/{user_id}")
-def getUserByIdFromDataBase(user_id: int) -> Dict[str, Any]:
+async def getUserByIdFromDataBase(user_id: int) -> Dict[str, Any]:
     """
     Retrieve a specific user by ID.
 
@@ -298,20 +2571,15 @@ def getUserByIdFromDataBase(user_id: int) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: User details or error message if not found
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
-        user = connector.get_user_by_id(user_id)
-        if user:
-            return user
-        else:
-            return {"error": f"User with ID {user_id} not found"}
-    finally:
-        connector.disconnect()
+    user = await run_query(lambda connector: connector.get_user_by_id(user_id))
+    if user:
+        return user
+    else:
+        return {"error": f"User with ID {user_id} not found"}
 
 
 @mcp.resource("resource://ecommerce/products/{product_id}")
-def getProductById(product_id: int) -> Dict[str, Any]:
+async def getProductById(product_id: int) -> Dict[str, Any]:
     """
     Retrieve a specific product by ID.
 
@@ -321,20 +2589,15 @@ def getProductById(product_id: int) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Product details or error message if not found
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
-        product = connector.get_product_by_id(product_id)
-        if product:
-            return product
-        else:
-            return {"error": f"Product with ID {product_id} not found"}
-    finally:
-        connector.disconnect()
+    product = await run_query(lambda connector: connector.get_product_by_id(product_id))
+    if product:
+        return product
+    else:
+        return {"error": f"Product with ID {product_id} not found"}
 
 
 @mcp.resource("resource://ecommerce/users/{user_id}/cards")
-def getCardsByUserId(user_id: int) -> List[Dict[str, Any]]:
+async def getCardsByUserId(user_id: int) -> List[Dict[str, Any]]:
     """
     Retrieve all payment cards for a specific user.
 
@@ -344,21 +2607,19 @@ def getCardsByUserId(user_id: int) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: Cards associated with the user
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
+    def fetch(connector: DatabaseConnector) -> List[Dict[str, Any]]:
         # First check if user exists
         user = connector.get_user_by_id(user_id)
         if not user:
             return [{"error": f"User with ID {user_id} not found"}]
 
         return connector.get_cards_by_user_id(user_id)
-    finally:
-        connector.disconnect()
+
+    return await run_query(fetch)
 
 
 @mcp.resource("resource://ecommerce/products/category/{category}")
-def getProductsByCategory(category: str) -> List[Dict[str, Any]]:
+async def getProductsByCategory(category: str) -> List[Dict[str, Any]]:
     """
     Retrieve all products in a specific category.
 
@@ -368,54 +2629,406 @@ def getProductsByCategory(category: str) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: Products in the specified category
     """
-    connector = get_db_connector()
-    try:
-        connector.connect()
-        return connector.get_products_by_category(category)
-    finally:
-        connector.disconnect()
+    return await run_query(lambda connector: connector.get_products_by_category(category))
+
+
+@mcp.resource("resource://ecommerce/products/category/{category}/columnar")
+async def getProductsByCategoryColumnar(category: str) -> Dict[str, Any]:
+    """
+    Retrieve all products in a specific category in columnar form.
+
+    Args:
+        category: Product category to filter by
+
+    Returns:
+        Dict[str, Any]: Column names and one list of values per product in the category
+    """
+    return await run_query(lambda connector: connector.get_products_by_category(category, columnar=True))
+
+
+@mcp.resource("resource://ecommerce/users/page/{cursor}")
+async def getUsersPageFromDatabase(cursor: str) -> Dict[str, Any]:
+    """
+    Retrieve one page of users in ID order.
+
+    Args:
+        cursor: "start" for the first page, otherwise the previous page's `next_cursor`
+
+    Returns:
+        Dict[str, Any]: Up to DEFAULT_PAGE_SIZE users and the `next_cursor` for the following page
+    """
+    return await _paginate("users", DEFAULT_PAGE_SIZE, cursor,
+                           lambda connector, limit, after: connector.get_users_page(limit, after))
+
+
+@mcp.resource("resource://ecommerce/products/page/{cursor}")
+async def getProductsPageFromDatabase(cursor: str) -> Dict[str, Any]:
+    """
+    Retrieve one page of products in ID order.
+
+    Args:
+        cursor: "start" for the first page, otherwise the previous page's `next_cursor`
+
+    Returns:
+        Dict[str, Any]: Up to DEFAULT_PAGE_SIZE products and the `next_cursor` for the following page
+    """
+    return await _paginate("products", DEFAULT_PAGE_SIZE, cursor,
+                           lambda connector, limit, after: connector.get_products_page(limit, after))
+
+
+@mcp.resource("resource://ecommerce/cards/page/{cursor}")
+async def getCardsPageFromDatabase(cursor: str) -> Dict[str, Any]:
+    """
+    Retrieve one page of payment cards in (user_id, id) order.
+
+    Args:
+        cursor: "start" for the first page, otherwise the previous page's `next_cursor`
+
+    Returns:
+        Dict[str, Any]: Up to DEFAULT_PAGE_SIZE cards and the `next_cursor` for the following page
+    """
+    return await _paginate("cards", DEFAULT_PAGE_SIZE, cursor,
+                           lambda connector, limit, after: connector.get_cards_page(limit, after))
 
 
 # Add MCP tools for the main functions that were requested
-@mcp.tool(name="getAllUsersFromDatabase", description="Get all users from the ecommerce database")
-def getAllUsersFromDatabase_tool() -> List[Dict[str, Any]]:
+@mcp.tool(name="getAllUsersFromDatabase", description="Get all users from the ecommerce database; set columnar to get column names once and rows as value lists")
+async def getAllUsersFromDatabase_tool(columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Retrieve all users from the database.
 
+    Args:
+        columnar: Return {"columns": [...], "rows": [[...], ...]}, which is about half the size
+
     Returns:
-        List[Dict[str, Any]]: All users in the database
+        Union[List[Dict[str, Any]], Dict[str, Any]]: All users in the database
     """
-    return getAllUsersFromDatabase()
+    if columnar:
+        return await getAllUsersColumnarFromDatabase()
+    return await getAllUsersFromDatabase()
 
 
-@mcp.tool(name="getAllProductsFromDatabase", description="Get all products from the ecommerce database")
-def getAllProductsFromDatabase_tool() -> List[Dict[str, Any]]:
+@mcp.tool(name="getAllProductsFromDatabase", description="Get all products from the ecommerce database; set columnar to get column names once and rows as value lists")
+async def getAllProductsFromDatabase_tool(columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Retrieve all products from the database.
 
+    Args:
+        columnar: Return {"columns": [...], "rows": [[...], ...]}, which is about half the size
+
     Returns:
-        List[Dict[str, Any]]: All products in the database
+        Union[List[Dict[str, Any]], Dict[str, Any]]: All products in the database
     """
-    return getAllProductsFromDatabase()
+    if columnar:
+        return await getAllProductsColumnarFromDatabase()
+    return await getAllProductsFromDatabase()
 
 
-@mcp.tool(name="getAllCardsFromDatabase", description="Get all payment cards from the ecommerce database")
-def getAllCardsFromDatabase_tool() -> List[Dict[str, Any]]:
+@mcp.tool(name="getAllCardsFromDatabase", description="Get all payment cards from the ecommerce database; set columnar to get column names once and rows as value lists")
+async def getAllCardsFromDatabase_tool(columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Retrieve all payment cards from the database.
 
+    Args:
+        columnar: Return {"columns": [...], "rows": [[...], ...]}, which is about half the size
+
     Returns:
-        List[Dict[str, Any]]: All cards in the database with associated user information
+        Union[List[Dict[str, Any]], Dict[str, Any]]: All cards in the database with associated user information
     """
-    return getAllCardsFromDatabase()
+    if columnar:
+        return await getAllCardsColumnarFromDatabase()
+    return await getAllCardsFromDatabase()
 
 
-if __name__ == "__main__":
+@mcp.tool(name="exportTable", description="Stream a whole ecommerce table (users, products or cards) to an NDJSON, CSV or Parquet file in the export directory")
+async def exportTable_tool(table: str, file_name: Optional[str] = None, format: str = "ndjson",
+                           compression: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Export a whole table to a file without loading it into memory.
+
+    Only the columns of the fixed `all_*` queries are written, so columns the connector
+    never serves (such as password hashes) stay out of exports. Arbitrary SQL can only be
+    exported from the command line (`merchant-export --query`).
+
+    Args:
+        table: "users", "products" or "cards"
+        file_name: Name of the file to write in ECOMMERCE_EXPORT_DIR; defaults to <table>.<format>[.gz|.bz2|.xz]
+        format: "ndjson", "csv" or "parquet" (requires pyarrow)
+        compression: "gzip", "bz2" or "xz" for NDJSON and CSV; "snappy", "gzip", "zstd", "brotli",
+                     "lz4" or "none" for Parquet
+
+    Returns:
+        Dict[str, Any]: The file path, number of rows, bytes written, elapsed seconds, rows/s and MB/s
+    """
+    path = _export_path(file_name or export_file_name(table, format, compression))
+    return await run_query(
+        lambda connector: export_table(connector, table, path, file_format=format, compression=compression),
+        timeout=float(os.environ.get("ECOMMERCE_EXPORT_TIMEOUT", "3600"))
+    )
+
+
+@mcp.tool(name="searchProducts", description="Full-text search of products by name, description and category, best matches first")
+async def searchProducts_tool(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Search products in the database.
+
+    Args:
+        query: Words to search for; every word must match and the last one may be a prefix
+        limit: Maximum number of products to return (up to 100)
+
+    Returns:
+        List[Dict[str, Any]]: Matching products with a relevance `rank` and a `snippet`
+    """
+    await ensure_connection_pool()
+    limit = max(1, min(limit, 100))
+    return await get_query_executor().run(get_product_search_index().search, query, limit)
+
+
+@mcp.tool(name="getUsersByIds", description="Get several users from the ecommerce database in one call, keyed by user ID")
+async def getUsersByIds_tool(user_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+    """
+    Retrieve several users by ID.
+
+    Args:
+        user_ids: IDs of the users to retrieve
+
+    Returns:
+        Dict[int, Optional[Dict[str, Any]]]: Each requested ID mapped to the user, or None if not found
+    """
+    users = await run_query(lambda connector: connector.get_users_by_ids(user_ids))
+    return {user_id: users.get(user_id) for user_id in user_ids}
+
+
+@mcp.tool(name="getProductsByIds", description="Get several products from the ecommerce database in one call, keyed by product ID")
+async def getProductsByIds_tool(product_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+    """
+    Retrieve several products by ID.
+
+    Args:
+        product_ids: IDs of the products to retrieve
+
+    Returns:
+        Dict[int, Optional[Dict[str, Any]]]: Each requested ID mapped to the product, or None if not found
+    """
+    products = await run_query(lambda connector: connector.get_products_by_ids(product_ids))
+    return {product_id: products.get(product_id) for product_id in product_ids}
+
+
+@mcp.tool(name="getCardsByUserIds", description="Get the payment cards of several users in one call, keyed by user ID")
+async def getCardsByUserIds_tool(user_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Retrieve the payment cards of several users.
+
+    Args:
+        user_ids: IDs of the users
+
+    Returns:
+        Dict[int, List[Dict[str, Any]]]: Each requested user ID mapped to that user's cards
+    """
+    return await run_query(lambda connector: connector.get_cards_by_user_ids(user_ids))
+
+
+@mcp.tool(name="getCategorySummary", description="Summarize products per category: product count, units in stock, inventory value, average/min/max price and out-of-stock count")
+async def getCategorySummary_tool() -> List[Dict[str, Any]]:
+    """
+    Summarize products per category, computed in the database.
+
+    Returns:
+        List[Dict[str, Any]]: One summary per category
+    """
+    return await run_query(lambda connector: connector.get_category_summary())
+
+
+@mcp.tool(name="getPricePercentiles", description="Get product price percentiles, overall or for one category")
+async def getPricePercentiles_tool(percentiles: Optional[List[int]] = None,
+                                   category: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Compute product price percentiles in the database.
+
+    Args:
+        percentiles: Percentiles to compute, each between 1 and 100; defaults to 25, 50, 75 and 90
+        category: Only consider products in this category; omit for all products
+
+    Returns:
+        Dict[str, Any]: The number of products considered and the price at each percentile
+    """
+    percentiles = percentiles or [25, 50, 75, 90]
+    return await run_query(lambda connector: connector.get_price_percentiles(percentiles, category))
+
+
+@mcp.tool(name="getLowInventoryProducts", description="List products with at most `threshold` units in stock, lowest stock first")
+async def getLowInventoryProducts_tool(threshold: int = 5, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Report products that are low on stock.
+
+    Args:
+        threshold: Include products with at most this many units in stock
+        limit: Maximum number of products to return (1-1000)
+
+    Returns:
+        List[Dict[str, Any]]: Product id, name, category, price and inventory, lowest stock first
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return await run_query(lambda connector: connector.get_low_inventory_products(threshold, limit))
+
+
+@mcp.tool(name="getRecentlyUpdatedProducts", description="List the most recently updated products, optionally only those updated since a timestamp")
+async def getRecentlyUpdatedProducts_tool(limit: int = 20, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Report the most recently updated products.
+
+    Args:
+        limit: Maximum number of products to return (1-1000)
+        since: Only include products updated at or after this timestamp ("YYYY-MM-DD[ HH:MM:SS]")
+
+    Returns:
+        List[Dict[str, Any]]: Product id, name, category, price, inventory and updated_at, newest first
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return await run_query(lambda connector: connector.get_recently_updated_products(limit, since))
+
+
+@mcp.tool(name="queryTable", description="Query products or users with filters (=, !=, <, <=, >, >=, in, between), a sort field and a limit; queries that would scan the whole table are rejected unless allow_scan is set")
+async def queryTable_tool(table: str, filters: Optional[List[Dict[str, Any]]] = None,
+                          sort_by: Optional[str] = None, descending: bool = False,
+                          limit: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None,
+                          allow_scan: bool = False) -> Dict[str, Any]:
+    """
+    Query a table with filters, sorting and a limit pushed down to SQL.
+
+    Args:
+        table: "products" or "users"
+        filters: Conditions combined with AND, e.g. [{"field": "price", "op": "between", "value": [10, 50]}]
+        sort_by: Field to sort on (id by default)
+        descending: Sort in descending order
+        limit: Maximum number of rows to return (1-1000)
+        fields: Columns to return; omit for all columns
+        allow_scan: Run the query even if no index serves it and it has to read the whole table
+
+    Returns:
+        Dict[str, Any]: The matching rows and the query plan used
+    """
+    await ensure_connection_pool()
+    query, params = build_filter_query(table, filters or [], sort_by, descending, limit, fields)
+    auditor = get_query_plan_auditor()
+
+    def plan_and_run(connector: DatabaseConnector) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        # Explained on the connection the query runs on, in the same executor call
+        report = auditor.explain_query(query, connector.connection)
+        if report["problems"] and not allow_scan:
+            raise ValueError(
+                "No index serves this query (%s). Filter or sort on an indexed field, "
+                "or set allow_scan to read the whole table." % "; ".join(report["problems"])
+            )
+        return report, connector.execute_filter_query(query, params)
+
+    report, items = await run_query(plan_and_run)
+    return {
+        "items": items,
+        "count": len(items),
+        "plan": report["plan"]
+    }
+
+
+@mcp.tool(name="getUsersPage", description="Get one page of users from the ecommerce database, with a cursor for the next page")
+async def getUsersPage_tool(limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retrieve one page of users in ID order.
+
+    Args:
+        limit: Maximum number of users to return (1-1000)
+        after: `next_cursor` from the previous page; omit for the first page
+
+    Returns:
+        Dict[str, Any]: The users on the page and `next_cursor` (None on the last page)
+    """
+    return await _paginate("users", limit, after,
+                           lambda connector, limit, after: connector.get_users_page(limit, after))
+
+
+@mcp.tool(name="getProductsPage", description="Get one page of products from the ecommerce database, with a cursor for the next page")
+async def getProductsPage_tool(limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retrieve one page of products in ID order.
+
+    Args:
+        limit: Maximum number of products to return (1-1000)
+        after: `next_cursor` from the previous page; omit for the first page
+
+    Returns:
+        Dict[str, Any]: The products on the page and `next_cursor` (None on the last page)
+    """
+    return await _paginate("products", limit, after,
+                           lambda connector, limit, after: connector.get_products_page(limit, after))
+
+
+@mcp.tool(name="getCardsPage", description="Get one page of payment cards from the ecommerce database, with a cursor for the next page")
+async def getCardsPage_tool(limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retrieve one page of payment cards in (user_id, id) order.
+
+    Args:
+        limit: Maximum number of cards to return (1-1000)
+        after: `next_cursor` from the previous page; omit for the first page
+
+    Returns:
+        Dict[str, Any]: The cards on the page and `next_cursor` (None on the last page)
+    """
+    return await _paginate("cards", limit, after,
+                           lambda connector, limit, after: connector.get_cards_page(limit, after))
+
+
+def export_main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point streaming a table or query to a file.
+
+    Example:
+        python merchant_db_connector.py export cards --format parquet --output cards.parquet
+    """
+    parser = argparse.ArgumentParser(
+        prog="merchant-export",
+        description="Stream an ecommerce table or query to NDJSON, CSV or Parquet in constant memory."
+    )
+    parser.add_argument("table", nargs="?", choices=["users", "products", "cards"],
+                        help="Table to export")
+    parser.add_argument("--query", help="SQL query to export instead of a table")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="Output format")
+    parser.add_argument("--compression",
+                        help="gzip, bz2 or xz for ndjson/csv; snappy, gzip, zstd, brotli, lz4 or none for parquet")
+    parser.add_argument("--output", help="File to write; defaults to <table>.<format> in the current directory")
+    parser.add_argument("--database", default=DEFAULT_DB_PATH, help="SQLite database to read")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="Rows fetched per batch")
+    args = parser.parse_args(argv)
+
+    if (args.table is None) == (args.query is None):
+        parser.error("give either a table or --query")
+
+    output = args.output or export_file_name(args.table or "query", args.format, args.compression)
+    # export_query runs --query with query_only set, so it cannot modify the database
+    connector = DatabaseConnector(db_path=args.database)
+    try:
+        if args.query is not None:
+            report = export_query(connector, args.query, output, file_format=args.format,
+                                  compression=args.compression, chunk_size=args.chunk_size)
+        else:
+            report = export_table(connector, args.table, output, chunk_size=args.chunk_size,
+                                  file_format=args.format, compression=args.compression)
+    except (ValueError, sqlite3.Error, OSError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        connector.disconnect()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+async def _smoke_test() -> None:
     # This is a simple test to ensure the connector is working
     print("Testing Ecommerce Database Connector...")
 
     # Test database information
-    db_info = get_database_info()
+    db_info = await get_database_info()
     print(f"Database Status: {db_info['status']}")
 
     if db_info['status'] == 'connected':
@@ -424,21 +3037,21 @@ if __name__ == "__main__":
             print(f"  - {entity}: {count}")
 
         # Test getting users
-        users = getAllUsersFromDatabase()
+        users = await getAllUsersFromDatabase()
         if users:
             print(f"\nFound {len(users)} users, first user: {users[0]['username']}")
         else:
             print("\nNo users found")
 
         # Test getting products
-        products = getAllProductsFromDatabase()
+        products = await getAllProductsFromDatabase()
         if products:
             print(f"Found {len(products)} products, first product: {products[0]['name']}")
         else:
             print("No products found")
 
         # Test getting cards
-        cards = getAllCardsFromDatabase()
+        cards = await getAllCardsFromDatabase()
         if cards:
             print(f"Found {len(cards)} payment cards")
         else:
@@ -447,3 +3060,7 @@ if __name__ == "__main__":
     print("\nTest complete.")
 
 
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        sys.exit(export_main(sys.argv[2:]))
+    asyncio.run(_smoke_test())
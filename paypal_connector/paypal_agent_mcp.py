@@ -1,29 +1,994 @@
 from fastmcp import FastMCP
-from typing import Dict, List, Optional, Union, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union, Any
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+import asyncio
+import base64
+import copy
+import hashlib
+import itertools
+import json
 import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 
 # Create the FastMCP server instance for MCP
 mcp = FastMCP(name="PayPal MCP Connector")
 
+class PayPalAPIError(Exception):
+    """Raised when a PayPal API call fails."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, response_text: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+
+class CircuitOpenError(PayPalAPIError):
+    """Raised without calling PayPal while the circuit breaker for its host is open."""
+
+
+# Largest page the Catalog Products API will return
+MAX_PAGE_SIZE = 20
+
+# Default number of in-flight requests for bulk product creation
+BULK_MAX_CONCURRENCY = int(os.environ.get("PAYPAL_BULK_MAX_CONCURRENCY", "8"))
+
+
+class TokenCache:
+    """Process-wide, thread-safe store of PayPal OAuth tokens keyed by (client_id, environment, base_url)."""
+
+    def __init__(self, refresh_margin: int = 300, expiry_skew: int = 30):
+        """
+        Initialize the token cache.
+
+        Args:
+            refresh_margin: Seconds before expiry at which a token is refreshed in the background
+            expiry_skew: Seconds shaved off `expires_in` so a token is never used right at its expiry
+        """
+        self.refresh_margin = refresh_margin
+        self.expiry_skew = expiry_skew
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._fetch_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._async_fetch_locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self._refreshing = set()
+        self._tasks = set()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "background_refreshes": 0,
+            "invalidations": 0,
+            "errors": 0
+        }
+
+    def get_token(self, key: Tuple[str, str, str], fetch: Callable[[], Tuple[str, int]]) -> str:
+        """
+        Return a valid token for `key`, fetching it with `fetch` on a miss.
+
+        Concurrent misses for the same key share a single fetch. A hit on a token
+        that is close to expiry schedules a background refresh and returns the
+        still-valid token immediately.
+
+        Args:
+            key: (client_id, environment, base_url) tuple identifying the credentials and API host
+            fetch: Callable returning (access_token, expires_in) from PayPal
+
+        Returns:
+            The OAuth access token
+        """
+        token, start_refresh = self._lookup(key)
+        if token is not None:
+            if start_refresh:
+                threading.Thread(
+                    target=self._background_refresh,
+                    args=(key, fetch),
+                    name="paypal-token-refresh",
+                    daemon=True
+                ).start()
+            return token
+
+        with self._fetch_locks.setdefault(key, threading.Lock()):
+            # Another thread may have fetched the token while we were waiting
+            token = self._peek(key)
+            if token is not None:
+                return token
+
+            try:
+                token, expires_in = fetch()
+            except Exception:
+                self._count("errors")
+                raise
+            return self._store(key, token, expires_in)
+
+    async def aget_token(self, key: Tuple[str, str, str], fetch: Callable[[], Awaitable[Tuple[str, int]]]) -> str:
+        """
+        Async counterpart of `get_token` for AsyncPayPalClient.
+
+        Args:
+            key: (client_id, environment, base_url) tuple identifying the credentials and API host
+            fetch: Coroutine function returning (access_token, expires_in) from PayPal
+
+        Returns:
+            The OAuth access token
+        """
+        token, start_refresh = self._lookup(key)
+        if token is not None:
+            if start_refresh:
+                task = asyncio.ensure_future(self._abackground_refresh(key, fetch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return token
+
+        async with self._async_fetch_locks.setdefault(key, asyncio.Lock()):
+            token = self._peek(key)
+            if token is not None:
+                return token
+
+            try:
+                token, expires_in = await fetch()
+            except Exception:
+                self._count("errors")
+                raise
+            return self._store(key, token, expires_in)
+
+    def invalidate(self, key: Tuple[str, str, str], token: Optional[str] = None) -> None:
+        """
+        Drop the cached token for `key`.
+
+        Args:
+            key: (client_id, environment, base_url) tuple identifying the credentials and API host
+            token: If given, only drop the entry when it still holds this token, so a
+                   token already replaced by another thread is left alone
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (token is None or entry["token"] == token):
+                del self._entries[key]
+                self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/refresh counters and the number of cached tokens."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else None,
+                "cached_tokens": len(self._entries)
+            }
+
+    def _lookup(self, key: Tuple[str, str, str]) -> Tuple[Optional[str], bool]:
+        """Return the cached token (or None on a miss) and whether the caller should start a refresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and entry["expires_at"] > now:
+                self._stats["hits"] += 1
+                if entry["refresh_at"] <= now and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    return entry["token"], True
+                return entry["token"], False
+
+            self._stats["misses"] += 1
+            return None, False
+
+    def _peek(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Return the cached token for `key` if still valid, without touching the counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] > time.monotonic():
+                return entry["token"]
+            return None
+
+    def _store(self, key: Tuple[str, str, str], token: str, expires_in: int) -> str:
+        """Store a freshly fetched token with its expiry and refresh deadlines."""
+        now = time.monotonic()
+        lifetime = max(expires_in - self.expiry_skew, 0)
+        with self._lock:
+            self._entries[key] = {
+                "token": token,
+                "expires_at": now + lifetime,
+                "refresh_at": now + max(lifetime - self.refresh_margin, lifetime / 2)
+            }
+            self._stats["refreshes"] += 1
+
+        return token
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _background_refresh(self, key: Tuple[str, str, str], fetch: Callable[[], Tuple[str, int]]) -> None:
+        """Refresh a token ahead of its expiry without blocking callers."""
+        try:
+            with self._fetch_locks.setdefault(key, threading.Lock()):
+                self._store(key, *fetch())
+            self._count("background_refreshes")
+        except Exception:
+            # The current token is still valid; the next caller after expiry fetches synchronously
+            self._count("errors")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _abackground_refresh(self, key: Tuple[str, str, str],
+                                   fetch: Callable[[], Awaitable[Tuple[str, int]]]) -> None:
+        """Async counterpart of `_background_refresh`."""
+        try:
+            async with self._async_fetch_locks.setdefault(key, asyncio.Lock()):
+                self._store(key, *(await fetch()))
+            self._count("background_refreshes")
+        except Exception:
+            self._count("errors")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+# Shared by every PayPalClient in the process so tools stop fetching a token per call
+token_cache = TokenCache(refresh_margin=int(os.environ.get("PAYPAL_TOKEN_REFRESH_MARGIN", "300")))
+
+
+class SessionPool:
+    """Long-lived keep-alive HTTP sessions shared by PayPalClient instances."""
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 20,
+                 pool_block: bool = False,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0,
+                 async_max_connections: int = 100):
+        """
+        Initialize the session pool.
+
+        Args:
+            pool_connections: Number of per-host connection pools each session keeps
+            pool_maxsize: Maximum number of connections kept open per host
+            pool_block: Wait for a free connection instead of opening one beyond `pool_maxsize`
+            connect_timeout: Seconds to wait for a TCP/TLS connection
+            read_timeout: Seconds to wait for response data
+            async_max_connections: Maximum concurrent connections per async client
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = (connect_timeout, read_timeout)
+        self.async_max_connections = async_max_connections
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[Tuple[str, str, str], requests.Session] = {}
+        # httpx.AsyncClient is bound to the event loop it first runs on
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def get_session(self, key: Tuple[str, str, str]) -> requests.Session:
+        """
+        Return the session for `key`, creating it on first use.
+
+        Args:
+            key: (client_id, environment, base_url) tuple identifying the credentials and API host
+
+        Returns:
+            A requests.Session with a pooled, keep-alive adapter mounted
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                # Sessions are shared by every tool call, so never carry cookies between them
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                self._sessions[key] = session
+            return session
+
+    def get_async_client(self, key: Tuple[str, str, str]) -> httpx.AsyncClient:
+        """
+        Return the async HTTP client for `key` on the running event loop, creating it on first use.
+
+        Args:
+            key: (client_id, environment, base_url) tuple identifying the credentials and API host
+
+        Returns:
+            An httpx.AsyncClient with a pooled, keep-alive transport
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.async_max_connections,
+                        max_keepalive_connections=self.pool_maxsize
+                    ),
+                    timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+                )
+                clients[key] = client
+            return client
+
+    def close(self) -> None:
+        """Close every pooled session and its open connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    async def aclose(self) -> None:
+        """Close the async clients created on the running event loop."""
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+
+# Reused across tool calls so requests to the same host skip the TCP + TLS handshake
+http_pool = SessionPool(
+    pool_connections=int(os.environ.get("PAYPAL_HTTP_POOL_CONNECTIONS", "10")),
+    pool_maxsize=int(os.environ.get("PAYPAL_HTTP_POOL_MAXSIZE", "20")),
+    pool_block=os.environ.get("PAYPAL_HTTP_POOL_BLOCK", "false").lower() == "true",
+    connect_timeout=float(os.environ.get("PAYPAL_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.environ.get("PAYPAL_READ_TIMEOUT", "30")),
+    async_max_connections=int(os.environ.get("PAYPAL_ASYNC_MAX_CONNECTIONS", "100"))
+)
+
+
+class ResponseCache:
+    """In-process LRU cache with a per-entry TTL and a memory budget for PayPal read responses."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the response cache.
+
+        Args:
+            ttl: Seconds an entry is served before it must be fetched again
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of the cached responses, as serialized JSON
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> (serialized value, expires_at); ordered from least to most recently used
+        self._entries: "OrderedDict[Tuple, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        # key or (scope, kind) -> number of times it was invalidated
+        self._generations: Dict[Tuple, int] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale_sets": 0
+        }
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """
+        Return a copy of the cached value for `key`, or None on a miss.
+
+        Args:
+            key: Cache key, see `cache_key`
+
+        Returns:
+            The cached response or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            serialized = entry[0]
+
+        # Stored as JSON so callers can never mutate the cached copy
+        return json.loads(serialized)
+
+    def generation(self, key: Tuple) -> Tuple[int, int]:
+        """
+        Return the invalidation generation of `key`.
+
+        Take it before fetching a response and pass it to `set`, so a response read
+        before a write invalidated the entry is not cached afterwards.
+        """
+        with self._lock:
+            return self._generations.get(key, 0), self._generations.get(key[:2], 0)
+
+    def set(self, key: Tuple, value: Any, generation: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Cache `value` under `key`, evicting least recently used entries to stay within budget.
+
+        Args:
+            key: Cache key, see `cache_key`
+            value: JSON-serializable response
+            generation: Result of `generation(key)` taken before the response was fetched;
+                        the response is dropped if the entry was invalidated since
+        """
+        serialized = json.dumps(value)
+        if len(serialized) > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != (self._generations.get(key, 0),
+                                                         self._generations.get(key[:2], 0)):
+                self._stats["stale_sets"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (serialized, time.monotonic() + self.ttl)
+            self._bytes += len(serialized)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Tuple) -> None:
+        """Drop the entry for `key` if present, and any response for it still being fetched."""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            if key in self._entries:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+
+    def invalidate_kind(self, scope: Tuple[str, str, str], kind: str) -> None:
+        """Drop every entry of one kind (e.g. all list pages) for a client scope, cached or being fetched."""
+        with self._lock:
+            self._generations[(scope, kind)] = self._generations.get((scope, kind), 0) + 1
+            for key in [key for key in self._entries if key[:2] == (scope, kind)]:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current memory use."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl
+            }
+
+    def _remove(self, key: Tuple) -> None:
+        serialized, _ = self._entries.pop(key)
+        self._bytes -= len(serialized)
+
+
+def cache_key(client: Any, kind: str, *parts: Any) -> Tuple:
+    """Build a response cache key scoped to the client's credentials and environment."""
+    return (client._token_key, kind) + parts
+
+
+# Serves repeated product reads within a conversation without another API call
+response_cache = ResponseCache(
+    ttl=float(os.environ.get("PAYPAL_CACHE_TTL", "60")),
+    max_entries=int(os.environ.get("PAYPAL_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.environ.get("PAYPAL_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+)
+
+
+class RetryPolicy:
+    """Decides which failed PayPal requests are retried and how long to wait between attempts."""
+
+    RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 20.0,
+                 max_elapsed: float = 60.0):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt
+            backoff_base: Upper bound of the first backoff delay in seconds, doubled per retry
+            backoff_max: Cap on a single backoff delay; a longer Retry-After gives up instead of retrying early
+            max_elapsed: No retry is started once this many seconds have passed since the first attempt
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_elapsed = max_elapsed
+
+    def is_retryable(self, method: str, headers: Dict[str, str]) -> bool:
+        """Only idempotent methods, or requests carrying a PayPal-Request-Id, are safe to resend."""
+        if method.upper() in self.IDEMPOTENT_METHODS:
+            return True
+        return any(name.lower() == "paypal-request-id" for name in headers)
+
+    def next_delay(self, attempt: int, started: float, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Return how long to wait before retry number `attempt`, or None to give up.
+
+        Args:
+            attempt: Number of retries already made
+            started: time.monotonic() of the first attempt
+            retry_after: Value of the response's Retry-After header, if any
+
+        Returns:
+            Delay in seconds, or None when the retry budget is exhausted or Retry-After asks
+            for a longer wait than backoff_max or the remaining max_elapsed budget
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        # Full jitter keeps many clients from retrying in lockstep
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        server_delay = self._parse_retry_after(retry_after)
+        if server_delay is not None:
+            # Never retry before the server allows it; give up instead if that is too long to wait
+            if server_delay > self.backoff_max:
+                return None
+            delay = max(delay, server_delay)
+
+        if time.monotonic() - started + delay > self.max_elapsed:
+            return None
+        return delay
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given either in seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    """Fails requests fast after repeated server-side failures, then probes for recovery."""
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures (5xx or transport errors) that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a single probe request is let through
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._stats = {
+            "opened": 0,
+            "rejected": 0
+        }
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self._lock:
+            if self._state == "closed":
+                return
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = "half_open"
+            # A probe that never reported back (e.g. it was cancelled) must not wedge the breaker
+            probe_expired = time.monotonic() - self._probe_started >= self.recovery_timeout
+            if self._state == "half_open" and (not self._probe_in_flight or probe_expired):
+                self._probe_in_flight = True
+                self._probe_started = time.monotonic()
+                return
+            self._stats["rejected"] += 1
+
+        raise CircuitOpenError("PayPal API circuit breaker is open; failing fast")
+
+    def record_success(self) -> None:
+        """Close the circuit after a request PayPal answered normally."""
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a server-side failure, opening the circuit at the threshold or after a failed probe."""
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the breaker state and counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "state": self._state,
+                "consecutive_failures": self._failures
+            }
+
+
+retry_policy = RetryPolicy(
+    max_retries=int(os.environ.get("PAYPAL_MAX_RETRIES", "3")),
+    backoff_base=float(os.environ.get("PAYPAL_BACKOFF_BASE", "0.5")),
+    backoff_max=float(os.environ.get("PAYPAL_BACKOFF_MAX", "20")),
+    max_elapsed=float(os.environ.get("PAYPAL_RETRY_MAX_ELAPSED", "60"))
+)
+
+# One breaker per API host, shared by the sync and async clients
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(base_url: str) -> CircuitBreaker:
+    """Return the circuit breaker for an API host, creating it on first use."""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(base_url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=int(os.environ.get("PAYPAL_BREAKER_FAILURE_THRESHOLD", "5")),
+                recovery_timeout=float(os.environ.get("PAYPAL_BREAKER_RECOVERY_TIMEOUT", "30"))
+            )
+            _circuit_breakers[base_url] = breaker
+        return breaker
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one in-flight execution and its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple, Dict[str, Any]] = {}
+        # key -> (task running the shared call, {"followers": count})
+        self._async_calls: Dict[Tuple, Tuple[asyncio.Future, Dict[str, int]]] = {}
+        self._stats = {
+            "executed": 0,
+            "coalesced": 0
+        }
+
+    def do(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` unless a call with the same key is already in flight, in which case wait for its result.
+
+        Args:
+            key: Identity of the call
+            fn: Callable performing the call
+
+        Returns:
+            The result of the (shared) call; every follower receives its own copy, so no two
+            callers ever hold the same object
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = {"done": threading.Event(), "result": None, "error": None, "followers": 0}
+                self._calls[key] = call
+                self._stats["executed"] += 1
+                leader = True
+            else:
+                call["followers"] += 1
+                self._stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return copy.deepcopy(call["result"])
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            # No follower can join once the key is gone, so the count below is final
+            with self._lock:
+                del self._calls[key]
+                followers = call["followers"]
+            try:
+                if followers and call["error"] is None:
+                    # Followers copy from a snapshot of their own; the leader's caller may
+                    # start changing `result` as soon as it is returned
+                    call["result"] = copy.deepcopy(result)
+            finally:
+                call["done"].set()
+        return result
+
+    async def ado(self, key: Tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async counterpart of `do`.
+
+        The shared call runs in its own task, so cancelling one caller never cancels
+        the request the other callers are waiting on.
+        """
+        key = (id(asyncio.get_running_loop()),) + key
+        call = {"followers": 0}
+
+        async def shared() -> Tuple[Any, Any]:
+            try:
+                result = await fn()
+            finally:
+                with self._lock:
+                    self._async_calls.pop(key, None)
+            # The leader gets `result` itself and followers copy a snapshot nobody else holds
+            return result, copy.deepcopy(result) if call["followers"] else None
+
+        with self._lock:
+            entry = self._async_calls.get(key)
+            if entry is None:
+                entry = (asyncio.ensure_future(shared()), call)
+                self._async_calls[key] = entry
+                self._stats["executed"] += 1
+                leader = True
+            else:
+                entry[1]["followers"] += 1
+                self._stats["coalesced"] += 1
+                leader = False
+
+        result, snapshot = await asyncio.shield(entry[0])
+        return result if leader else copy.deepcopy(snapshot)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many calls were executed and how many joined an in-flight call."""
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": len(self._calls) + len(self._async_calls)
+            }
+
+
+# Concurrent identical GETs share one upstream request
+single_flight = SingleFlight()
+
+
+def _single_flight_key(client: Any, method: str, url: str, kwargs: Dict[str, Any],
+                       headers: Dict[str, str]) -> Optional[Tuple]:
+    """Key identifying a coalescable request, or None if the request must not be shared."""
+    if method.upper() != "GET" or "json" in kwargs or "data" in kwargs:
+        return None
+
+    params = kwargs.get("params") or {}
+    if isinstance(params, dict):
+        params = tuple(sorted((str(name), str(value)) for name, value in params.items()))
+    else:
+        params = repr(params)
+    return (client._token_key, url, params, tuple(sorted(headers.items())))
+
+
+class TokenBucket:
+    """Token bucket handing out reservations, so callers queue in arrival order."""
+
+    def __init__(self, rate: float, burst: float):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens the bucket holds
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, possibly borrowing against future refills, and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """Paces outbound PayPal requests through a global bucket and one bucket per endpoint class."""
+
+    ENDPOINT_CLASSES = ("oauth", "catalog_read", "catalog_write", "other")
+
+    def __init__(self, global_limit: Tuple[float, float], class_limits: Dict[str, Tuple[float, float]]):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            global_limit: (requests per second, burst) across all requests; a rate of 0 disables it
+            class_limits: (requests per second, burst) per endpoint class; classes with a rate
+                          of 0 or left out are only subject to the global limit
+        """
+        self._buckets: Dict[str, TokenBucket] = {}
+        if global_limit[0] > 0:
+            self._buckets["global"] = TokenBucket(*global_limit)
+        for endpoint_class, (rate, burst) in class_limits.items():
+            if rate > 0:
+                self._buckets[endpoint_class] = TokenBucket(rate, burst)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            endpoint_class: {
+                "requests": 0,
+                "delayed": 0,
+                "queue_depth": 0,
+                "max_queue_depth": 0,
+                "total_wait_seconds": 0.0,
+                "max_wait_seconds": 0.0
+            }
+            for endpoint_class in self.ENDPOINT_CLASSES
+        }
+
+    @staticmethod
+    def classify(method: str, url: str) -> str:
+        """Map a request to its endpoint class."""
+        if "/v1/oauth2/" in url:
+            return "oauth"
+        if "/v1/catalogs/" in url:
+            return "catalog_read" if method.upper() in ("GET", "HEAD") else "catalog_write"
+        return "other"
+
+    def acquire(self, method: str, url: str) -> None:
+        """Block until the request may be sent."""
+        endpoint_class, wait = self._reserve(method, url)
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            self._release(endpoint_class)
+
+    async def aacquire(self, method: str, url: str) -> None:
+        """Wait, without blocking the event loop, until the request may be sent."""
+        endpoint_class, wait = self._reserve(method, url)
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._release(endpoint_class)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return configured limits plus request counts, queue depth and wait times per endpoint class."""
+        with self._lock:
+            return {
+                "limits": {name: {"rate": bucket.rate, "burst": bucket.burst}
+                           for name, bucket in self._buckets.items()},
+                "endpoints": {
+                    endpoint_class: {
+                        **stats,
+                        "avg_wait_seconds": stats["total_wait_seconds"] / stats["requests"] if stats["requests"] else 0.0
+                    }
+                    for endpoint_class, stats in self._stats.items()
+                }
+            }
+
+    def _reserve(self, method: str, url: str) -> Tuple[str, float]:
+        endpoint_class = self.classify(method, url)
+        wait = 0.0
+        for name in ("global", endpoint_class):
+            bucket = self._buckets.get(name)
+            if bucket is not None:
+                wait = max(wait, bucket.reserve())
+
+        with self._lock:
+            stats = self._stats[endpoint_class]
+            stats["requests"] += 1
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+            if wait > 0:
+                stats["delayed"] += 1
+                stats["total_wait_seconds"] += wait
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+        return endpoint_class, wait
+
+    def _release(self, endpoint_class: str) -> None:
+        with self._lock:
+            self._stats[endpoint_class]["queue_depth"] -= 1
+
+
+def _rate_limit_from_env(name: str, default_rate: str) -> Tuple[float, float]:
+    """Read a (rate, burst) pair from PAYPAL_RATE_LIMIT<name> and PAYPAL_RATE_BURST<name>."""
+    rate = float(os.environ.get(f"PAYPAL_RATE_LIMIT{name}", default_rate))
+    burst = float(os.environ.get(f"PAYPAL_RATE_BURST{name}", str(max(rate, 1.0))))
+    return rate, burst
+
+
+# Keeps sustained traffic just under PayPal's limits instead of bouncing off 429s
+rate_limiter = RateLimiter(
+    global_limit=_rate_limit_from_env("", "50"),
+    class_limits={
+        "catalog_read": _rate_limit_from_env("_CATALOG_READ", "40"),
+        "catalog_write": _rate_limit_from_env("_CATALOG_WRITE", "10")
+    }
+)
+
+
+def _parse_response(response) -> Any:
+    """Return the JSON body of a successful PayPal response or raise on failure."""
+    if response.status_code in [200, 201, 204]:
+        try:
+            return response.json()
+        except:
+            return {"status": "success"}
+    else:
+        raise PayPalAPIError(f"API request failed: {response.text}",
+                             status_code=response.status_code, response_text=response.text)
+
 
 # PayPal API Client class
 class PayPalClient:
-    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True):
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True,
+                 base_url: Optional[str] = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.sandbox = sandbox
 
-        # Set the base URL based on environment
-        if sandbox:
+        # Set the base URL based on environment; an explicit base_url points at a stand-in API
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        elif sandbox:
             self.base_url = "https://api-m.sandbox.paypal.com"
         else:
             self.base_url = "https://api-m.paypal.com"
 
         self.token = None
+        self.session = http_pool.get_session(self._token_key)
+
+    @property
+    def environment(self) -> str:
+        """Name of the PayPal environment this client talks to."""
+        return "sandbox" if self.sandbox else "live"
+
+    @property
+    def _token_key(self) -> Tuple[str, str, str]:
+        return (self.client_id, self.environment, self.base_url)
+
+    def _get_auth_token(self, force_refresh: bool = False) -> str:
+        """
+        Get OAuth token from PayPal, served from the shared token cache.
+
+        Args:
+            force_refresh: Discard the token this client last used and fetch a new one
 
-    def _get_auth_token(self) -> str:
-        """Get OAuth token from PayPal."""
+        Returns:
+            The OAuth access token
+        """
+        if force_refresh and self.token is not None:
+            token_cache.invalidate(self._token_key, self.token)
+
+        self.token = token_cache.get_token(self._token_key, self._fetch_auth_token)
+        return self.token
+
+    def _fetch_auth_token(self) -> Tuple[str, int]:
+        """Request a new OAuth token from PayPal and return it with its lifetime in seconds."""
         url = f"{self.base_url}/v1/oauth2/token"
         headers = {
             "Accept": "application/json",
@@ -31,23 +996,25 @@ class PayPalClient:
         }
         data = {"grant_type": "client_credentials"}
 
-        response = requests.post(
+        rate_limiter.acquire("POST", url)
+        response = self.session.post(
             url,
             auth=(self.client_id, self.client_secret),
             headers=headers,
-            data=data
+            data=data,
+            timeout=http_pool.timeout
         )
 
         if response.status_code == 200:
-            self.token = response.json()["access_token"]
-            return self.token
+            body = response.json()
+            return body["access_token"], int(body.get("expires_in", 3600))
         else:
-            raise Exception(f"Failed to get auth token: {response.text}")
+            raise PayPalAPIError(f"Failed to get auth token: {response.text}",
+                                 status_code=response.status_code, response_text=response.text)
 
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests."""
-        if self.token is None:
-            self._get_auth_token()
+        self._get_auth_token()
 
         return {
             "Content-Type": "application/json",
@@ -55,23 +1022,356 @@ class PayPalClient:
         }
 
     def request(self, method: str, endpoint: str, **kwargs):
-        """Make a request to the PayPal API."""
+        """
+        Make a request to the PayPal API.
+
+        Transient failures (timeouts, connection errors, 408/429/5xx) are retried with
+        jittered exponential backoff when the request is idempotent or carries a
+        PayPal-Request-Id. A `timeout` keyword overrides the pool's (connect, read) timeouts.
+        Concurrent identical GETs share a single upstream request.
+
+        Raises:
+            PayPalAPIError: The request failed, or CircuitOpenError if PayPal is currently failing
+        """
         url = f"{self.base_url}{endpoint}"
-        headers = self._get_headers()
+        extra_headers = kwargs.pop("headers", {})
+        kwargs.setdefault("timeout", http_pool.timeout)
 
-        # Merge headers with any provided in kwargs
-        if "headers" in kwargs:
-            headers = {**headers, **kwargs.pop("headers")}
+        key = _single_flight_key(self, method, url, kwargs, extra_headers)
+        if key is not None:
+            return single_flight.do(key, lambda: self._request(method, url, extra_headers, **kwargs))
+        return self._request(method, url, extra_headers, **kwargs)
 
-        response = requests.request(method, url, headers=headers, **kwargs)
+    def _request(self, method: str, url: str, extra_headers: Dict[str, str], **kwargs):
+        """Send a request with retries and circuit breaking and parse the response."""
+        breaker = get_circuit_breaker(self.base_url)
+        retryable = retry_policy.is_retryable(method, extra_headers)
+        started = time.monotonic()
+        attempt = 0
 
-        if response.status_code in [200, 201, 204]:
+        while True:
+            rate_limiter.acquire(method, url)
+            breaker.before_request()
             try:
-                return response.json()
-            except:
-                return {"status": "success"}
+                response = self._send(method, url, extra_headers, **kwargs)
+            except requests.RequestException as e:
+                breaker.record_failure()
+                delay = retry_policy.next_delay(attempt, started) if retryable else None
+                if delay is None:
+                    raise PayPalAPIError(f"API request failed: {e}") from e
+            except PayPalAPIError as e:
+                # The OAuth token could not be fetched, so the API request itself was never sent
+                if e.status_code is None or e.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                delay = None
+                if e.status_code in retry_policy.RETRY_STATUSES:
+                    delay = retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                delay = None
+                if retryable and response.status_code in retry_policy.RETRY_STATUSES:
+                    delay = retry_policy.next_delay(attempt, started, response.headers.get("Retry-After"))
+                if delay is None:
+                    return _parse_response(response)
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method: str, url: str, extra_headers: Dict[str, str], **kwargs):
+        """Send a single request, retrying once with a fresh token on a 401."""
+        # Merge headers with any provided in kwargs
+        headers = {**self._get_headers(), **extra_headers}
+        response = self.session.request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 401:
+            # The cached token was revoked or expired early; retry once with a fresh one
+            self._get_auth_token(force_refresh=True)
+            headers = {**self._get_headers(), **extra_headers}
+            response = self.session.request(method, url, headers=headers, **kwargs)
+
+        return response
+
+    def list_products(self, page: int = 1, page_size: int = MAX_PAGE_SIZE,
+                      total_required: bool = False) -> Dict[str, Any]:
+        """
+        Fetch one page of the product catalog.
+
+        Args:
+            page: 1-based page number
+            page_size: Number of products per page (at most MAX_PAGE_SIZE)
+            total_required: Ask PayPal to include `total_items` and `total_pages`
+
+        Returns:
+            Dict[str, Any]: The raw list response for the page
+        """
+        params = {
+            "page": page,
+            "page_size": page_size,
+            "total_required": str(total_required).lower()
+        }
+        return self.request("GET", "/v1/catalogs/products", params=params)
+
+    def iter_products(self, page_size: int = MAX_PAGE_SIZE, max_workers: int = 4,
+                      start_page: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every product in the catalog.
+
+        The first page is fetched with `total_required` to learn the page count; the
+        remaining pages are then fetched concurrently, at most `max_workers` at a time,
+        and their products are yielded as each page arrives (so not in catalog order).
+
+        Args:
+            page_size: Number of products per page (at most MAX_PAGE_SIZE)
+            max_workers: Maximum number of pages in flight at once
+            start_page: Page to start from
+
+        Returns:
+            Iterator over product summaries
+        """
+        first = self.list_products(page=start_page, page_size=page_size, total_required=True)
+        yield from first.get("products", [])
+
+        remaining = iter(range(start_page + 1, first.get("total_pages", start_page) + 1))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paypal-pages") as executor:
+            in_flight = {executor.submit(self.list_products, page, page_size)
+                         for page in itertools.islice(remaining, max_workers)}
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Keep the window full before handing products to the caller
+                    next_page = next(remaining, None)
+                    if next_page is not None:
+                        in_flight.add(executor.submit(self.list_products, next_page, page_size))
+                    yield from future.result().get("products", [])
+
+
+# Async PayPal API Client class
+class AsyncPayPalClient:
+    """asyncio counterpart of PayPalClient backed by a pooled httpx.AsyncClient."""
+
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True,
+                 base_url: Optional[str] = None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.sandbox = sandbox
+
+        # Set the base URL based on environment; an explicit base_url points at a stand-in API
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        elif sandbox:
+            self.base_url = "https://api-m.sandbox.paypal.com"
         else:
-            raise Exception(f"API request failed: {response.text}")
+            self.base_url = "https://api-m.paypal.com"
+
+        self.token = None
+
+    @property
+    def environment(self) -> str:
+        """Name of the PayPal environment this client talks to."""
+        return "sandbox" if self.sandbox else "live"
+
+    @property
+    def _token_key(self) -> Tuple[str, str, str]:
+        return (self.client_id, self.environment, self.base_url)
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for the running event loop."""
+        return http_pool.get_async_client(self._token_key)
+
+    async def _get_auth_token(self, force_refresh: bool = False) -> str:
+        """
+        Get OAuth token from PayPal, served from the shared token cache.
+
+        Args:
+            force_refresh: Discard the token this client last used and fetch a new one
+
+        Returns:
+            The OAuth access token
+        """
+        if force_refresh and self.token is not None:
+            token_cache.invalidate(self._token_key, self.token)
+
+        self.token = await token_cache.aget_token(self._token_key, self._fetch_auth_token)
+        return self.token
+
+    async def _fetch_auth_token(self) -> Tuple[str, int]:
+        """Request a new OAuth token from PayPal and return it with its lifetime in seconds."""
+        url = f"{self.base_url}/v1/oauth2/token"
+        headers = {
+            "Accept": "application/json",
+            "Accept-Language": "en_US"
+        }
+        data = {"grant_type": "client_credentials"}
+
+        await rate_limiter.aacquire("POST", url)
+        response = await self.session.post(
+            url,
+            auth=(self.client_id, self.client_secret),
+            headers=headers,
+            data=data
+        )
+
+        if response.status_code == 200:
+            body = response.json()
+            return body["access_token"], int(body.get("expires_in", 3600))
+        else:
+            raise PayPalAPIError(f"Failed to get auth token: {response.text}",
+                                 status_code=response.status_code, response_text=response.text)
+
+    async def _get_headers(self) -> Dict[str, str]:
+        """Get headers for API requests."""
+        await self._get_auth_token()
+
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.token}"
+        }
+
+    async def request(self, method: str, endpoint: str, **kwargs):
+        """
+        Make a request to the PayPal API.
+
+        Retries, the circuit breaker and GET coalescing behave as in PayPalClient.request.
+
+        Raises:
+            PayPalAPIError: The request failed, or CircuitOpenError if PayPal is currently failing
+        """
+        url = f"{self.base_url}{endpoint}"
+        extra_headers = kwargs.pop("headers", {})
+
+        # Accept the (connect, read) tuples used with PayPalClient
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, tuple):
+            kwargs["timeout"] = httpx.Timeout(timeout[1], connect=timeout[0])
+
+        key = _single_flight_key(self, method, url, kwargs, extra_headers)
+        if key is not None:
+            return await single_flight.ado(key, lambda: self._request(method, url, extra_headers, **kwargs))
+        return await self._request(method, url, extra_headers, **kwargs)
+
+    async def _request(self, method: str, url: str, extra_headers: Dict[str, str], **kwargs):
+        """Send a request with retries and circuit breaking and parse the response."""
+        breaker = get_circuit_breaker(self.base_url)
+        retryable = retry_policy.is_retryable(method, extra_headers)
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            await rate_limiter.aacquire(method, url)
+            breaker.before_request()
+            try:
+                response = await self._send(method, url, extra_headers, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                delay = retry_policy.next_delay(attempt, started) if retryable else None
+                if delay is None:
+                    raise PayPalAPIError(f"API request failed: {e!r}") from e
+            except PayPalAPIError as e:
+                # The OAuth token could not be fetched, so the API request itself was never sent
+                if e.status_code is None or e.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                delay = None
+                if e.status_code in retry_policy.RETRY_STATUSES:
+                    delay = retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                delay = None
+                if retryable and response.status_code in retry_policy.RETRY_STATUSES:
+                    delay = retry_policy.next_delay(attempt, started, response.headers.get("Retry-After"))
+                if delay is None:
+                    return _parse_response(response)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(self, method: str, url: str, extra_headers: Dict[str, str], **kwargs):
+        """Send a single request, retrying once with a fresh token on a 401."""
+        # Merge headers with any provided in kwargs
+        headers = {**(await self._get_headers()), **extra_headers}
+        response = await self.session.request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 401:
+            # The cached token was revoked or expired early; retry once with a fresh one
+            await self._get_auth_token(force_refresh=True)
+            headers = {**(await self._get_headers()), **extra_headers}
+            response = await self.session.request(method, url, headers=headers, **kwargs)
+
+        return response
+
+    async def list_products(self, page: int = 1, page_size: int = MAX_PAGE_SIZE,
+                            total_required: bool = False) -> Dict[str, Any]:
+        """
+        Fetch one page of the product catalog.
+
+        Args:
+            page: 1-based page number
+            page_size: Number of products per page (at most MAX_PAGE_SIZE)
+            total_required: Ask PayPal to include `total_items` and `total_pages`
+
+        Returns:
+            Dict[str, Any]: The raw list response for the page
+        """
+        params = {
+            "page": page,
+            "page_size": page_size,
+            "total_required": str(total_required).lower()
+        }
+        return await self.request("GET", "/v1/catalogs/products", params=params)
+
+    async def iter_products(self, page_size: int = MAX_PAGE_SIZE, max_workers: int = 4,
+                            start_page: int = 1) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every product in the catalog.
+
+        Async counterpart of PayPalClient.iter_products: pages after the first are
+        fetched concurrently, at most `max_workers` at a time, and their products are
+        yielded as each page arrives.
+
+        Args:
+            page_size: Number of products per page (at most MAX_PAGE_SIZE)
+            max_workers: Maximum number of pages in flight at once
+            start_page: Page to start from
+
+        Returns:
+            Async iterator over product summaries
+        """
+        first = await self.list_products(page=start_page, page_size=page_size, total_required=True)
+        for product in first.get("products", []):
+            yield product
+
+        remaining = iter(range(start_page + 1, first.get("total_pages", start_page) + 1))
+        in_flight = {asyncio.ensure_future(self.list_products(page, page_size))
+                     for page in itertools.islice(remaining, max_workers)}
+        try:
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    next_page = next(remaining, None)
+                    if next_page is not None:
+                        in_flight.add(asyncio.ensure_future(self.list_products(next_page, page_size)))
+                    for product in task.result().get("products", []):
+                        yield product
+        finally:
+            # The caller stopped early or a page failed; don't leave orphaned requests running
+            for task in in_flight:
+                task.cancel()
 
 
 # Helper function to get PayPal client
@@ -82,10 +1382,305 @@ def get_paypal_client():
     return PayPalClient(client_id, client_secret, sandbox=True)
 
 
+# Helper function to get async PayPal client, used by the MCP tools
+def get_async_paypal_client():
+    client_id = os.environ.get("PAYPAL_CLIENT_ID", "default - wont work")
+    client_secret = os.environ.get("PAYPAL_CLIENT_SECRET", "default - wont work")
+    return AsyncPayPalClient(client_id, client_secret, sandbox=True)
+
+
+class CatalogMirror:
+    """Local SQLite mirror of the PayPal catalog for fast, indexed product search."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS products (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        type TEXT,
+        category TEXT,
+        description TEXT,
+        image_url TEXT,
+        home_url TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        summary_hash TEXT,
+        payload TEXT NOT NULL,
+        synced_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_products_name ON products(name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_products_type ON products(type);
+    CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+    CREATE TABLE IF NOT EXISTS sync_state (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+
+    def __init__(self, db_path: str, client: PayPalClient):
+        """
+        Initialize the mirror, creating its schema if needed.
+
+        Args:
+            db_path: Path to the SQLite mirror database
+            client: PayPal client used to fetch the catalog (may point at a stand-in API)
+        """
+        self.db_path = db_path
+        self.client = client
+
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self._lock, self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    def sync(self, full: bool = False, max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Bring the mirror up to date with the PayPal catalog.
+
+        The catalog listing is walked once. Product details are then fetched only for
+        products that are new, whose listed `update_time` is newer than the mirrored
+        one, or (when the listing carries no `update_time`) whose listed name or
+        description changed, or that were marked stale after an update through this
+        server. Products no longer listed are removed.
+
+        Args:
+            full: Refetch the details of every product
+            max_workers: Maximum number of concurrent PayPal requests
+
+        Returns:
+            Dict[str, Any]: Counts of listed, fetched and removed products and the sync duration
+        """
+        started = time.monotonic()
+        with self._lock:
+            known = {
+                row["id"]: (row["update_time"], row["summary_hash"])
+                for row in self.connection.execute("SELECT id, update_time, summary_hash FROM products")
+            }
+
+        listed = {}
+        for summary in self.client.iter_products(max_workers=max_workers):
+            listed[summary["id"]] = summary
+
+        changed = []
+        for product_id, summary in listed.items():
+            stored = known.get(product_id)
+            if full or stored is None or stored[1] is None:
+                changed.append(product_id)
+            elif summary.get("update_time"):
+                if summary["update_time"] > (stored[0] or ""):
+                    changed.append(product_id)
+            elif self._summary_hash(summary) != stored[1]:
+                changed.append(product_id)
+
+        def fetch(product_id: str) -> Dict[str, Any]:
+            return self.client.request("GET", f"/v1/catalogs/products/{product_id}")
+
+        batch = []
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paypal-mirror") as executor:
+            for product_id, product in zip(changed, executor.map(fetch, changed)):
+                batch.append((product, listed[product_id]))
+                # Commit in batches so a large re-sync is not one write per product
+                if len(batch) >= 500:
+                    self._upsert_many(batch)
+                    batch = []
+        self._upsert_many(batch)
+
+        removed = [product_id for product_id in known if product_id not in listed]
+        with self._lock, self.connection:
+            self.connection.executemany("DELETE FROM products WHERE id = ?", [(pid,) for pid in removed])
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_sync', ?)",
+                (str(time.time()),)
+            )
+
+        return {
+            "listed": len(listed),
+            "fetched": len(changed),
+            "removed": len(removed),
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+
+    def upsert(self, product: Dict[str, Any], summary: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store full product details in the mirror.
+
+        Args:
+            product: Product details as returned by `/v1/catalogs/products/{id}`
+            summary: The product's entry in the catalog listing, used for change detection
+        """
+        self._upsert_many([(product, summary or product)])
+
+    def _upsert_many(self, products: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """Store (details, listing summary) pairs in a single transaction."""
+        now = time.time()
+        rows = [
+            (
+                product["id"], product.get("name", ""), product.get("type"),
+                product.get("category"), product.get("description"),
+                product.get("image_url"), product.get("home_url"),
+                product.get("create_time"), product.get("update_time"),
+                self._summary_hash(summary), json.dumps(product), now
+            )
+            for product, summary in products
+        ]
+        with self._lock, self.connection:
+            self.connection.executemany(
+                """
+                INSERT OR REPLACE INTO products
+                    (id, name, type, category, description, image_url, home_url,
+                     create_time, update_time, summary_hash, payload, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+
+    def mark_stale(self, product_id: str) -> None:
+        """Force the next sync to refetch a product, e.g. after it was updated through this server."""
+        with self._lock, self.connection:
+            self.connection.execute("UPDATE products SET summary_hash = NULL WHERE id = ?", (product_id,))
+
+    def search(self,
+               name: Optional[str] = None,
+               type: Optional[str] = None,
+               category: Optional[str] = None,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Search the mirrored products.
+
+        Args:
+            name: Case-insensitive substring of the product name
+            type: Exact product type (PHYSICAL, DIGITAL, SERVICE)
+            category: Exact product category
+            limit: Maximum number of products to return
+
+        Returns:
+            List of mirrored product details, ordered by name
+        """
+        clauses = []
+        params = []
+        if name:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        if type:
+            clauses.append("type = ?")
+            params.append(type.upper())
+        if category:
+            clauses.append("category = ?")
+            params.append(category.upper())
+
+        query = "SELECT payload FROM products"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY name COLLATE NOCASE LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [json.loads(row["payload"]) for row in rows]
+
+    def status(self) -> Dict[str, Any]:
+        """Return the number of mirrored products and the time of the last sync."""
+        with self._lock:
+            count = self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            last_sync = self.connection.execute(
+                "SELECT value FROM sync_state WHERE key = 'last_sync'"
+            ).fetchone()
+        return {
+            "database_path": self.db_path,
+            "products": count,
+            "last_sync": float(last_sync["value"]) if last_sync else None
+        }
+
+    def close(self) -> None:
+        """Close the mirror database."""
+        with self._lock:
+            self.connection.close()
+
+    @staticmethod
+    def _summary_hash(summary: Dict[str, Any]) -> str:
+        """Fingerprint of the fields the catalog listing exposes."""
+        fields = [summary.get("name"), summary.get("description"), summary.get("update_time")]
+        return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+
+_catalog_mirror: Optional[CatalogMirror] = None
+_catalog_mirror_lock = threading.Lock()
+
+
+# Helper function to get the process-wide catalog mirror
+def get_catalog_mirror() -> CatalogMirror:
+    global _catalog_mirror
+    with _catalog_mirror_lock:
+        if _catalog_mirror is None:
+            db_path = os.environ.get(
+                "PAYPAL_MIRROR_PATH",
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), "paypal_catalog_mirror.db")
+            )
+            _catalog_mirror = CatalogMirror(db_path, get_paypal_client())
+        return _catalog_mirror
+
+
+@mcp.resource("config://paypal/token-cache")
+def get_token_cache_stats() -> Dict[str, Any]:
+    """
+    Get OAuth token cache statistics.
+
+    Returns:
+        Dict[str, Any]: Hit/miss/refresh counters for the shared token cache
+    """
+    return token_cache.stats()
+
+
+@mcp.resource("config://paypal/circuit-breaker")
+def get_circuit_breaker_stats() -> Dict[str, Any]:
+    """
+    Get circuit breaker state for each PayPal API host.
+
+    Returns:
+        Dict[str, Any]: Breaker state and counters keyed by base URL
+    """
+    with _circuit_breakers_lock:
+        breakers = dict(_circuit_breakers)
+    return {base_url: breaker.stats() for base_url, breaker in breakers.items()}
+
+
+@mcp.resource("config://paypal/single-flight")
+def get_single_flight_stats() -> Dict[str, Any]:
+    """
+    Get request coalescing statistics.
+
+    Returns:
+        Dict[str, Any]: Executed and coalesced GET request counts
+    """
+    return single_flight.stats()
+
+
+@mcp.resource("config://paypal/rate-limiter")
+def get_rate_limiter_stats() -> Dict[str, Any]:
+    """
+    Get outbound rate limiter statistics.
+
+    Returns:
+        Dict[str, Any]: Configured limits, queue depth and wait times per endpoint class
+    """
+    return rate_limiter.stats()
+
+
+@mcp.resource("config://paypal/cache")
+def get_response_cache_stats() -> Dict[str, Any]:
+    """
+    Get product response cache statistics.
+
+    Returns:
+        Dict[str, Any]: Hit rate, eviction counters and memory use of the response cache
+    """
+    return response_cache.stats()
+
+
 # Define functions for PayPal's Merchant Catalog Products API
 
-@mcp.tool()
-def create_product_in_paypal(
+def build_product_payload(
         name: str,
         type: str,
         description: Optional[str] = None,
@@ -93,20 +1688,11 @@ def create_product_in_paypal(
         image_url: Optional[str] = None,
         home_url: Optional[str] = None) -> Dict[str, Any]:
     """
-    Create a product in the PayPal catalog.
-
-    Args:
-        name: The product name
-        type: The product type (PHYSICAL, DIGITAL, SERVICE)
-        description: The product description
-        category: The product category
-        image_url: URL for the product image
-        home_url: Home URL for the product
+    Build the request payload for creating a catalog product.
 
     Returns:
-        Dict[str, Any]: The created product details
+        Dict[str, Any]: The payload with only the provided optional fields set
     """
-    # Build the request payload
     payload = {
         "name": name,
         "type": type
@@ -121,41 +1707,152 @@ def create_product_in_paypal(
     if home_url:
         payload["home_url"] = home_url
 
+    return payload
+
+
+def product_request_id(payload: Dict[str, Any], batch_id: str, index: int) -> str:
+    """
+    Derive a deterministic PayPal-Request-Id for one item of a create batch.
+
+    Resending the same batch (same `batch_id`, same item at the same position) makes
+    PayPal return the products it already created instead of creating duplicates,
+    while identical items within a batch, or in another batch, still get their own ID.
+    """
+    canonical = json.dumps([batch_id, index, payload], sort_keys=True, separators=(",", ":"))
+    return "catalog-create-" + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@mcp.tool()
+async def create_product_in_paypal(
+        name: str,
+        type: str,
+        description: Optional[str] = None,
+        category: Optional[str] = None,
+        image_url: Optional[str] = None,
+        home_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Create a product in the PayPal catalog.
+
+    Args:
+        name: The product name
+        type: The product type (PHYSICAL, DIGITAL, SERVICE)
+        description: The product description
+        category: The product category
+        image_url: URL for the product image
+        home_url: Home URL for the product
+
+    Returns:
+        Dict[str, Any]: The created product details
+    """
+    # Build the request payload
+    payload = build_product_payload(name, type, description, category, image_url, home_url)
+
     # Get PayPal client and make the request
-    client = get_paypal_client()
+    client = get_async_paypal_client()
     endpoint = "/v1/catalogs/products"
     method = "POST"
 
-    response = client.request(method, endpoint, json=payload)
+    response = await client.request(method, endpoint, json=payload)
+
+    # Write-through: the new product is readable from cache and list pages are now stale
+    if isinstance(response, dict) and response.get("id"):
+        response_cache.set(cache_key(client, "product", response["id"]), response)
+    response_cache.invalidate_kind(client._token_key, "list")
     return response
 
 
+@mcp.tool()
+async def create_products_in_paypal(
+        products: List[Dict[str, Any]],
+        max_concurrency: int = BULK_MAX_CONCURRENCY,
+        batch_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Create many products in the PayPal catalog in one call.
+
+    Each item is sent with a PayPal-Request-Id derived from the batch ID, its position
+    and its payload (or the item's own `request_id`). Re-running a partially failed
+    batch with the returned `batch_id` never creates duplicates, and identical items
+    in one batch are still created separately.
+
+    Args:
+        products: Product payloads, each with `name` and `type` and optionally
+                  `description`, `category`, `image_url`, `home_url` and `request_id`
+        max_concurrency: Maximum number of create requests in flight at once
+        batch_id: `batch_id` returned by an earlier call, to retry that batch; omit for a new batch
+
+    Returns:
+        Dict[str, Any]: The batch ID, created/failed counts and a per-item result in input order
+    """
+    batch_id = batch_id or uuid.uuid4().hex
+    client = get_async_paypal_client()
+    endpoint = "/v1/catalogs/products"
+    method = "POST"
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def create_one(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(item, dict):
+            return {"index": index, "status": "error", "error": "Invalid product payload: each product must be an object"}
+        try:
+            payload = build_product_payload(
+                item["name"],
+                item["type"],
+                item.get("description"),
+                item.get("category"),
+                item.get("image_url"),
+                item.get("home_url")
+            )
+        except KeyError as e:
+            return {"index": index, "status": "error", "error": f"Invalid product payload: missing {e}"}
+        except TypeError as e:
+            return {"index": index, "status": "error", "error": f"Invalid product payload: {e}"}
+
+        request_id = item.get("request_id") or product_request_id(payload, batch_id, index)
+        async with semaphore:
+            try:
+                product = await client.request(method, endpoint, json=payload,
+                                               headers={"PayPal-Request-Id": request_id})
+            except Exception as e:
+                return {"index": index, "status": "error", "request_id": request_id, "error": str(e)}
+
+        if isinstance(product, dict) and product.get("id"):
+            response_cache.set(cache_key(client, "product", product["id"]), product)
+        return {"index": index, "status": "success", "request_id": request_id, "product": product}
+
+    results = await asyncio.gather(*(create_one(i, item) for i, item in enumerate(products)))
+    created = sum(1 for result in results if result["status"] == "success")
+    if created:
+        response_cache.invalidate_kind(client._token_key, "list")
+
+    return {
+        "batch_id": batch_id,
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
+
 @mcp.resource("config://app")
-def list_products_from_paypal() -> Dict[str, Any]:
+async def list_products_from_paypal() -> Dict[str, Any]:
     """
     List products from the PayPal catalog. No arguments are required
 
     Returns:
         Dict[str, Any]: The list of products using specified pagination settings
     """
-    # Set up query parameters
-    params = {
-        "page": 1,
-        "page_size": 20,
-        "total_required": str(True).lower()
-    }
-
     # Get PayPal client and make the request
-    client = get_paypal_client()
-    endpoint = "/v1/catalogs/products"
-    method = "GET"
+    client = get_async_paypal_client()
+    key = cache_key(client, "list", 1, MAX_PAGE_SIZE)
 
-    response = client.request(method, endpoint, params=params)
+    response = response_cache.get(key)
+    if response is None:
+        generation = response_cache.generation(key)
+        response = await client.list_products(page=1, page_size=MAX_PAGE_SIZE, total_required=True)
+        response_cache.set(key, response, generation)
     return response
 
 
 @mcp.resource(uri="resource://paypal/products/{product_id}", name="Show Product Details", mime_type="application/json")
-def show_product_details_from_paypal(product_id: str) -> Dict[str, Any]:
+async def show_product_details_from_paypal(product_id: str) -> Dict[str, Any]:
     """
     Show details of a specific product.
 
@@ -166,16 +1863,21 @@ def show_product_details_from_paypal(product_id: str) -> Dict[str, Any]:
         Dict[str, Any]: The product details
     """
     # Get PayPal client and make the request
-    client = get_paypal_client()
+    client = get_async_paypal_client()
     endpoint = f"/v1/catalogs/products/{product_id}"
     method = "GET"
+    key = cache_key(client, "product", product_id)
 
-    response = client.request(method, endpoint)
+    response = response_cache.get(key)
+    if response is None:
+        generation = response_cache.generation(key)
+        response = await client.request(method, endpoint)
+        response_cache.set(key, response, generation)
     return response
 
 
 @mcp.tool()
-def update_products_to_paypal(
+async def update_products_to_paypal(
         product_id: str,
         description: Optional[str] = None,
         category: Optional[str] = None,
@@ -226,16 +1928,22 @@ def update_products_to_paypal(
         raise ValueError("At least one field must be provided for update")
 
     # Get PayPal client and make the request
-    client = get_paypal_client()
+    client = get_async_paypal_client()
     endpoint = f"/v1/catalogs/products/{product_id}"
     method = "PATCH"
 
-    response = client.request(method, endpoint, json=payload)
+    response = await client.request(method, endpoint, json=payload)
+
+    # PATCH returns no body, so drop the stale details instead of refreshing them
+    response_cache.invalidate(cache_key(client, "product", product_id))
+    response_cache.invalidate_kind(client._token_key, "list")
+    if _catalog_mirror is not None:
+        _catalog_mirror.mark_stale(product_id)
     return response
 
 
 @mcp.tool(name="list_products", description="List products from PayPal")
-def list_products_tool() -> Dict[str, Any]:
+async def list_products_tool() -> Dict[str, Any]:
     """
     List products from the PayPal catalog.
 
@@ -244,11 +1952,63 @@ def list_products_tool() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: The list of products
     """
-    return list_products_from_paypal()
+    return await list_products_from_paypal()
+
+
+@mcp.tool(name="list_products_page", description="List one page of products from PayPal, with a cursor for the next page")
+async def list_products_page_tool(
+        page: int = 1,
+        page_size: int = MAX_PAGE_SIZE,
+        cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    List one page of products from the PayPal catalog.
+
+    Args:
+        page: 1-based page number, ignored when a cursor is given
+        page_size: Number of products per page (1-20), ignored when a cursor is given
+        cursor: `next_cursor` value from a previous call, to continue walking the catalog
+
+    Returns:
+        Dict[str, Any]: The products on the page, totals and `next_cursor` (None on the last page)
+    """
+    if cursor:
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            page, page_size = int(position["page"]), int(position["page_size"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    if page < 1:
+        raise ValueError("page must be 1 or greater")
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    client = get_async_paypal_client()
+    key = cache_key(client, "list", page, page_size)
+
+    response = response_cache.get(key)
+    if response is None:
+        generation = response_cache.generation(key)
+        response = await client.list_products(page=page, page_size=page_size, total_required=True)
+        response_cache.set(key, response, generation)
+
+    total_pages = response.get("total_pages", page)
+    next_cursor = None
+    if page < total_pages:
+        next_position = json.dumps({"page": page + 1, "page_size": page_size})
+        next_cursor = base64.urlsafe_b64encode(next_position.encode()).decode()
+
+    return {
+        "products": response.get("products", []),
+        "page": page,
+        "page_size": page_size,
+        "total_items": response.get("total_items"),
+        "total_pages": total_pages,
+        "next_cursor": next_cursor
+    }
 
 
 @mcp.tool(name="show_product_details", description="Show details of a specific product")
-def show_product_details_tool(product_id: str) -> Dict[str, Any]:
+async def show_product_details_tool(product_id: str) -> Dict[str, Any]:
     """
     Show details of a specific product.
 
@@ -258,4 +2018,57 @@ def show_product_details_tool(product_id: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: The product details
     """
-    return show_product_details_from_paypal(product_id)
\ No newline at end of file
+    return await show_product_details_from_paypal(product_id)
+
+
+@mcp.tool(name="sync_product_mirror", description="Sync the local mirror of the PayPal catalog")
+async def sync_product_mirror_tool(full: bool = False) -> Dict[str, Any]:
+    """
+    Sync the local SQLite mirror of the PayPal catalog.
+
+    Args:
+        full: Refetch every product instead of only new and changed ones
+
+    Returns:
+        Dict[str, Any]: Counts of listed, fetched and removed products
+    """
+    mirror = get_catalog_mirror()
+    return await asyncio.to_thread(mirror.sync, full)
+
+
+@mcp.tool(name="search_mirrored_products", description="Search the local mirror of the PayPal catalog by name, type or category")
+def search_mirrored_products_tool(
+        name: Optional[str] = None,
+        type: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 50) -> Dict[str, Any]:
+    """
+    Search the local mirror of the PayPal catalog.
+
+    Args:
+        name: Case-insensitive substring of the product name
+        type: Product type (PHYSICAL, DIGITAL, SERVICE)
+        category: Product category
+        limit: Maximum number of products to return (at most 500)
+
+    Returns:
+        Dict[str, Any]: Matching products and the mirror's last sync time
+    """
+    mirror = get_catalog_mirror()
+    products = mirror.search(name=name, type=type, category=category, limit=max(1, min(limit, 500)))
+    return {
+        "products": products,
+        "count": len(products),
+        "last_sync": mirror.status()["last_sync"]
+    }
+
+
+@mcp.resource("config://paypal/mirror")
+def get_catalog_mirror_status() -> Dict[str, Any]:
+    """
+    Get the status of the local catalog mirror.
+
+    Returns:
+        Dict[str, Any]: Mirror location, product count and last sync time
+    """
+    return get_catalog_mirror().status()
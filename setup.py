@@ -6,12 +6,17 @@ setup(
     packages=find_packages(),
     install_requires=[
         "requests>=2.25.0",
+        "httpx>=0.24.0",
         "flask>=2.0.0",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=10.0.0"],
+    },
     entry_points={
         'console_scripts': [
             'mcp-connector=paypal_connector.cli:main',
             'mcp-server=paypal_connector.standalone_server:main',
+            'merchant-export=merchant_connector.merchant_db_connector:export_main',
         ],
     },
     author="Rishabh Sharma",
@@ -0,0 +1,152 @@
+"""Sync the PayPal catalog mirror against a local stand-in for the PayPal API."""
+
+import http.server
+import json
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+from paypal_connector.paypal_agent_mcp import CatalogMirror, PayPalClient
+
+
+class StandInCatalog:
+    """In-memory catalog served over HTTP with the PayPal endpoints the mirror uses."""
+
+    def __init__(self, products):
+        self.products = {product["id"]: dict(product) for product in products}
+        self.token = f"token-{uuid.uuid4().hex}"
+        self.token_requests = 0
+        self.detail_requests = []
+        self._lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path != "/v1/oauth2/token":
+                    return self._send(404, {"name": "RESOURCE_NOT_FOUND"})
+                with stand_in._lock:
+                    stand_in.token_requests += 1
+                self._send(200, {"access_token": stand_in.token, "expires_in": 3600})
+
+            def do_GET(self):
+                if self.headers.get("Authorization") != f"Bearer {stand_in.token}":
+                    return self._send(401, {"error": "invalid_token"})
+                url = urlparse(self.path)
+                if url.path == "/v1/catalogs/products":
+                    return self._send(200, stand_in.page(parse_qs(url.query)))
+                product_id = url.path.rsplit("/", 1)[-1]
+                with stand_in._lock:
+                    stand_in.detail_requests.append(product_id)
+                    product = stand_in.products.get(product_id)
+                if product is None:
+                    return self._send(404, {"name": "RESOURCE_NOT_FOUND"})
+                self._send(200, product)
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def page(self, query):
+        """Build a list response for the requested page, as PayPal does."""
+        page = int(query.get("page", ["1"])[0])
+        page_size = int(query.get("page_size", ["10"])[0])
+        with self._lock:
+            ids = sorted(self.products)
+            summaries = [
+                {key: self.products[pid][key] for key in ("id", "name", "description", "create_time", "update_time")}
+                for pid in ids[(page - 1) * page_size:page * page_size]
+            ]
+        response = {"products": summaries}
+        if query.get("total_required") == ["true"]:
+            response["total_items"] = len(ids)
+            response["total_pages"] = max(1, -(-len(ids) // page_size))
+        return response
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_product(number, update_time="2024-01-01T00:00:00Z"):
+    return {
+        "id": f"PROD-{number:04d}",
+        "name": f"Product {number}",
+        "type": "PHYSICAL",
+        "category": "SOFTWARE",
+        "description": f"Description {number}",
+        "create_time": "2024-01-01T00:00:00Z",
+        "update_time": update_time
+    }
+
+
+class CatalogMirrorSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.stand_in = StandInCatalog([make_product(number) for number in range(1, 26)])
+        self.addCleanup(self.stand_in.close)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        client = PayPalClient(f"client-{uuid.uuid4().hex}", "secret", base_url=self.stand_in.base_url)
+        self.mirror = CatalogMirror(os.path.join(directory.name, "mirror.db"), client)
+        self.addCleanup(self.mirror.close)
+
+    def test_full_incremental_and_changed_sync(self):
+        result = self.mirror.sync()
+        self.assertEqual(result["listed"], 25)
+        self.assertEqual(result["fetched"], 25)
+        self.assertEqual(result["removed"], 0)
+        self.assertEqual(sorted(self.stand_in.detail_requests), sorted(self.stand_in.products))
+        self.assertEqual(self.mirror.status()["products"], 25)
+
+        self.stand_in.detail_requests.clear()
+        result = self.mirror.sync()
+        self.assertEqual(result["listed"], 25)
+        self.assertEqual(result["fetched"], 0)
+        self.assertEqual(self.stand_in.detail_requests, [])
+
+        changed = self.stand_in.products["PROD-0007"]
+        changed.update(description="Updated description", category="HARDWARE",
+                       update_time="2024-02-01T00:00:00Z")
+        result = self.mirror.sync()
+        self.assertEqual(result["fetched"], 1)
+        self.assertEqual(self.stand_in.detail_requests, ["PROD-0007"])
+        self.assertEqual(self.mirror.search(category="HARDWARE"), [changed])
+        self.assertEqual(self.stand_in.token_requests, 1)
+
+
+class BaseUrlScopeTest(unittest.TestCase):
+    def test_clients_for_different_hosts_do_not_share_tokens(self):
+        first = StandInCatalog([make_product(1)])
+        self.addCleanup(first.close)
+        second = StandInCatalog([make_product(2)])
+        self.addCleanup(second.close)
+
+        client_id = f"client-{uuid.uuid4().hex}"
+        first_client = PayPalClient(client_id, "secret", base_url=first.base_url)
+        second_client = PayPalClient(client_id, "secret", base_url=second.base_url)
+
+        self.assertEqual([p["id"] for p in first_client.iter_products()], ["PROD-0001"])
+        self.assertEqual([p["id"] for p in second_client.iter_products()], ["PROD-0002"])
+        self.assertEqual((first.token_requests, second.token_requests), (1, 1))
+        self.assertIsNot(first_client.session, second_client.session)
+
+
+if __name__ == "__main__":
+    unittest.main()